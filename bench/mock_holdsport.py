@@ -0,0 +1,212 @@
+"""Lokal stand-in for api.holdsport.dk/v1 til test og benchmarks.
+
+Serverer /v1/teams, /v1/teams/{id}/activities og tilmeldingens action_path
+ud fra et scenarie: antal hold, aktiviteter pr. hold, hvornår tilmeldingen
+åbner, svartid og perioder med 5xx-fejl. /_stats returnerer tællere og
+tidspunkter, så et benchmark kan måle botten udefra.
+
+    python -m bench.mock_holdsport --teams 8 --open-in 10 --port 8099
+"""
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import random
+import time
+from datetime import datetime, timedelta
+
+from aiohttp import web
+
+TARGET_NAME = "Herre 4 træning"
+
+
+class Scenario:
+    def __init__(self, teams=3, activities=20, open_in=10.0, latency=0.0, error_rate=0.0,
+                 error_burst=None, actions_before_open=False, hint=True, days=30):
+        self.teams = teams
+        self.activities = activities
+        self.open_in = open_in
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_burst = error_burst  # (start, duration) i sekunder efter opstart
+        self.actions_before_open = actions_before_open
+        self.hint = hint
+        self.days = days
+
+    @classmethod
+    def from_args(cls, args):
+        burst = None
+        if args.error_burst:
+            start, duration = args.error_burst.split(":")
+            burst = (float(start), float(duration))
+        return cls(args.teams, args.activities, args.open_in, args.latency, args.error_rate,
+                   burst, args.actions_before_open, not args.no_hint, args.days)
+
+
+class MockHoldsport:
+    def __init__(self, scenario):
+        self.scenario = scenario
+        self.started = time.time()
+        self.opens_at = self.started + scenario.open_in
+        self.signups = {}  # (user, activity_id) -> tidspunkt
+        self.requests = {"teams": 0, "activities": 0, "signup": 0, "other": 0, "errors": 0, "not_modified": 0}
+        self.bytes_sent = 0
+        self.first_signup = None
+        self.calendar = self._build_calendar()
+
+    def _build_calendar(self):
+        """Aktiviteter pr. hold; hold 1's første aktivitet er den botten skal have"""
+        scenario = self.scenario
+        now = datetime.now().replace(second=0, microsecond=0)
+        today = now.replace(hour=18, minute=0)
+        calendar = {}
+        next_id = 1000
+        for team_id in range(1, scenario.teams + 1):
+            activities = []
+            for n in range(scenario.activities):
+                is_target = team_id == 1 and n == 0
+                if is_target:
+                    # Tæt nok på til at den adaptive polling også uden hint tjekker ofte
+                    starttime = now + timedelta(hours=6)
+                else:
+                    starttime = today + timedelta(days=(n % scenario.days) + 1, minutes=15 * (n // scenario.days))
+                activities.append({
+                    "id": next_id,
+                    "name": TARGET_NAME if is_target else f"Træning {team_id}-{n}",
+                    "starttime": starttime.isoformat(),
+                    "endtime": (starttime + timedelta(hours=2)).isoformat(),
+                    "place": f"Hal {n % 4 + 1}",
+                    "comment": "Husk vand og godt humør. " * 4,
+                    "club": "Mock IF",
+                    "attendance_count": random.randint(0, 20),
+                    "action_path": f"/v1/activities/{next_id}/activities_users",
+                    "action_method": "POST",
+                })
+                next_id += 1
+            calendar[team_id] = activities
+        return calendar
+
+    @staticmethod
+    def _user(request):
+        header = request.headers.get("Authorization", "")
+        if not header.startswith("Basic "):
+            return None
+        return base64.b64decode(header[6:]).decode().split(":", 1)[0]
+
+    def _is_open(self):
+        return time.time() >= self.opens_at
+
+    def _render(self, activity, user):
+        rendered = dict(activity)
+        signed_up = (user, activity["id"]) in self.signups
+        rendered["status"] = "tilmeldt" if signed_up else ""
+        if self.scenario.hint and activity["name"] == TARGET_NAME:
+            rendered["registration_start"] = datetime.fromtimestamp(self.opens_at).astimezone().isoformat()
+        can_join = not signed_up and (self._is_open() or self.scenario.actions_before_open or activity["name"] != TARGET_NAME)
+        rendered["actions"] = [{"activities_user": {"name": "Tilmeld", "joined_status": 1}}] if can_join else []
+        return rendered
+
+    async def _simulate(self, request):
+        """Fælles svartid og fejl; returnerer en fejl-Response eller None"""
+        if self.scenario.latency:
+            await asyncio.sleep(self.scenario.latency)
+        if self._user(request) is None:
+            return web.Response(status=401)
+        elapsed = time.time() - self.started
+        burst = self.scenario.error_burst
+        if (burst and burst[0] <= elapsed < burst[0] + burst[1]) or random.random() < self.scenario.error_rate:
+            self.requests["errors"] += 1
+            return web.Response(status=503, text="Service Unavailable")
+        return None
+
+    def _json(self, request, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode()
+        etag = '"' + hashlib.md5(body).hexdigest() + '"'
+        if request.headers.get("If-None-Match") == etag:
+            self.requests["not_modified"] += 1
+            return web.Response(status=304, headers={"ETag": etag})
+        self.bytes_sent += len(body)
+        return web.Response(body=body, content_type="application/json", headers={"ETag": etag})
+
+    async def teams(self, request):
+        self.requests["teams"] += 1
+        error = await self._simulate(request)
+        if error is not None:
+            return error
+        return self._json(request, [{"id": team_id, "name": f"Hold {team_id}"} for team_id in self.calendar])
+
+    async def activities(self, request):
+        self.requests["activities"] += 1
+        error = await self._simulate(request)
+        if error is not None:
+            return error
+        team_id = int(request.match_info["team_id"])
+        if team_id not in self.calendar:
+            return web.Response(status=404)
+        start = request.query.get("date", "0000-00-00")
+        end = request.query.get("end_date", "9999-99-99")
+        user = self._user(request)
+        return self._json(request, [
+            self._render(activity, user) for activity in self.calendar[team_id]
+            if start <= activity["starttime"][:10] <= end
+        ])
+
+    async def signup(self, request):
+        self.requests["signup"] += 1
+        error = await self._simulate(request)
+        if error is not None:
+            return error
+        activity_id = int(request.match_info["activity_id"])
+        is_target = self.calendar.get(1) and self.calendar[1][0]["id"] == activity_id
+        if is_target and not self._is_open():
+            return web.json_response({"error": "Tilmelding er ikke åben"}, status=403)
+        now = time.time()
+        self.signups.setdefault((self._user(request), activity_id), now)
+        if is_target and self.first_signup is None:
+            self.first_signup = now
+        return web.json_response({"joined_status": 1}, status=201)
+
+    async def head(self, request):
+        self.requests["other"] += 1
+        return web.Response()
+
+    async def stats(self, request):
+        return web.json_response({
+            "requests": self.requests,
+            "bytes_sent": self.bytes_sent,
+            "opens_at": self.opens_at,
+            "first_signup": self.first_signup,
+            "open_to_signup": self.first_signup - self.opens_at if self.first_signup else None,
+        })
+
+    def app(self):
+        app = web.Application()
+        app.router.add_get("/v1/teams", self.teams)
+        app.router.add_get("/v1/teams/{team_id}/activities", self.activities)
+        app.router.add_route("*", "/v1/activities/{activity_id}/activities_users", self.signup)
+        app.router.add_route("HEAD", "/v1", self.head)
+        app.router.add_get("/_stats", self.stats)
+        return app
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Mock Holdsport API")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--teams", type=int, default=3)
+    parser.add_argument("--activities", type=int, default=20, help="aktiviteter pr. hold")
+    parser.add_argument("--days", type=int, default=30, help="dage aktiviteterne fordeles over")
+    parser.add_argument("--open-in", type=float, default=10.0, help="sekunder til tilmeldingen åbner")
+    parser.add_argument("--latency", type=float, default=0.0, help="svartid i sekunder")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="andel af requests der giver 503")
+    parser.add_argument("--error-burst", help="START:VARIGHED i sekunder med 503 på alt")
+    parser.add_argument("--actions-before-open", action="store_true",
+                        help="vis Tilmeld-handlingen før åbning (svarer 403 indtil da)")
+    parser.add_argument("--no-hint", action="store_true", help="udelad registration_start i payload")
+    return parser
+
+
+if __name__ == "__main__":
+    args = build_parser().parse_args()
+    web.run_app(MockHoldsport(Scenario.from_args(args)).app(), host="127.0.0.1", port=args.port,
+                print=None, access_log=None)
@@ -0,0 +1,87 @@
+"""Micro-benchmark: rå dicts fra json.loads mod den streamende Activity-parser.
+
+Svarene bygges af mock-serveren, så de ligner det botten får. For hver
+størrelse måles bedste parse-tid, peak-hukommelse under parsningen og
+hvad resultatet fylder bagefter (tracemalloc; selve svaret tælles ikke med).
+
+    python -m bench.parse_activities --sizes 100 1000 5000
+"""
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+
+from bench.mock_holdsport import MockHoldsport, Scenario
+from holdsport_bot.activity import parse_activities
+
+
+def dict_path(body):
+    # Det aiohttp's response.json() gør: hele svaret som str og hele træet
+    return json.loads(body.decode("utf-8"))
+
+
+def stream_path(body):
+    return parse_activities(body)
+
+
+PATHS = {"dict": dict_path, "stream": stream_path}
+
+
+def build_body(size):
+    mock = MockHoldsport(Scenario(teams=1, activities=size, days=60))
+    return json.dumps([mock._render(activity, "bench") for activity in mock.calendar[1]]).encode()
+
+
+def best_times(body, repeat):
+    """Bedste tid pr. vej; vejene skiftes, så støj rammer dem ens"""
+    best = dict.fromkeys(PATHS, float("inf"))
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            for name, parse in PATHS.items():
+                start = time.perf_counter()
+                parse(body)
+                best[name] = min(best[name], time.perf_counter() - start)
+    finally:
+        gc.enable()
+    return best
+
+
+def memory(parse, body):
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    result = parse(body)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert len(result) == len(json.loads(body))
+    return {"peak_kb": (peak - base) / 1024, "retained_kb": (retained - base) / 1024}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sammenlign dict- og Activity-parsning af aktivitetslister")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 5000], help="aktiviteter pr. svar")
+    parser.add_argument("--repeat", type=int, default=20, help="gentagelser til tidsmålingen")
+    parser.add_argument("--json", action="store_true", help="skriv resultaterne som JSON")
+    args = parser.parse_args()
+
+    results = []
+    for size in args.sizes:
+        body = build_body(size)
+        times = best_times(body, args.repeat)
+        for name, parse in PATHS.items():
+            results.append({"activities": size, "path": name, "body_kb": len(body) / 1024,
+                            "parse_ms": times[name] * 1000, **memory(parse, body)})
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'activities':>10}  {'path':>6}  {'body KB':>8}  {'parse ms':>8}  {'peak KB':>8}  {'retained KB':>11}")
+    for r in results:
+        print(f"{r['activities']:>10}  {r['path']:>6}  {r['body_kb']:>8.1f}  {r['parse_ms']:>8.2f}  "
+              f"{r['peak_kb']:>8.1f}  {r['retained_kb']:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
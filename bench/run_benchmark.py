@@ -0,0 +1,200 @@
+"""End-to-end benchmark af botten mod den lokale mock-server.
+
+Hvert scenarie kører i sin egen proces: mock-serveren startes som
+underproces, botten peges på den via HOLDSPORT_API_BASE, og scannings-
+løkken kører som i holdsport_bot.app i et fast antal sekunder. Til sidst måles
+åbning→tilmelding (set fra serveren), requests pr. cyklus, CPU-tid og
+peak RSS for botprocessen.
+
+    python -m bench.run_benchmark                 # alle scenarier
+    python -m bench.run_benchmark opening sniper  # udvalgte
+"""
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import resource
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# navn -> (mock-argumenter, varighed i sekunder, ekstra miljøvariabler)
+SCENARIOS = {
+    "opening": (["--teams", "3", "--open-in", "8"], 15, {}),
+    "sniper": (["--teams", "3", "--open-in", "8", "--actions-before-open"], 15, {}),
+    "no-hint": (["--teams", "3", "--open-in", "8", "--no-hint"], 15, {"CHECK_INTERVAL": "5"}),
+    "many-teams": (["--teams", "60", "--open-in", "8"], 15, {}),
+    "large": (["--teams", "2", "--activities", "3000", "--days", "7", "--open-in", "8"], 15, {}),
+    "slow": (["--teams", "8", "--open-in", "8", "--latency", "0.3"], 15, {}),
+    "long-window": (["--teams", "4", "--activities", "400", "--days", "90", "--open-in", "8"], 15, {"DAYS_AHEAD": "60"}),
+    "flaky": (["--teams", "8", "--open-in", "8", "--error-rate", "0.05", "--error-burst", "2:6"], 30, {}),
+}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for(url, timeout=10):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                return json.load(response)
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.05)
+
+
+def peak_rss_kb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+async def drive(bot, duration):
+    """Scanningsløkken fra app.main() uden features og statusbeskeder"""
+    from holdsport_bot import scheduler
+    from holdsport_bot.holdsport_client import close_shared_session
+
+    scans = []
+    bot.notifier.start()
+    end = time.monotonic() + duration
+    try:
+        while time.monotonic() < end:
+            matches = await bot.fetch_activities()
+            scans.append(bot.status["last_scan_duration"])
+            delay, _ = scheduler.next_poll_delay(matches, bot.CHECK_INTERVAL, failures=bot.status["failed_scans"])
+            await asyncio.sleep(max(0.0, min(delay, end - time.monotonic())))
+    finally:
+        for account in bot.ACCOUNTS:
+            account.sniper.cancel_all()
+        await bot.notifier.close()
+        await close_shared_session()
+    return scans
+
+
+def run_child(name):
+    mock_args, duration, extra_env = SCENARIOS[name]
+    port = free_port()
+    mock = subprocess.Popen(
+        [sys.executable, "-m", "bench.mock_holdsport", "--port", str(port), *mock_args],
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_for(f"http://127.0.0.1:{port}/_stats")
+        os.environ.update({
+            "HOLDSPORT_API_BASE": f"http://127.0.0.1:{port}/v1",
+            "HOLDSPORT_USERNAME": "bench",
+            "HOLDSPORT_PASSWORD": "bench",
+            "HOLDSPORT_ACTIVITY_NAME": "Herre 4 træning",
+            "TELEGRAM_BOT_TOKEN": "",
+            "DISCORD_WEBHOOK_URL": "",
+            "STATE_DB": "",
+            "ACCOUNTS_FILE": "",
+            **extra_env,
+        })
+        # Botten logger til holdsport.log i arbejdsmappen
+        os.chdir(tempfile.mkdtemp(prefix="holdsport-bench-"))
+        sys.path.insert(0, ROOT)
+        rss_before = peak_rss_kb()
+        bot = importlib.import_module("holdsport_bot.app")
+        rss_imported = peak_rss_kb()
+
+        cpu_start = time.process_time()
+        scans = asyncio.run(drive(bot, duration))
+        cpu = time.process_time() - cpu_start
+        stats = wait_for(f"http://127.0.0.1:{port}/_stats")
+    finally:
+        mock.terminate()
+        mock.wait()
+
+    requests = stats["requests"]
+    api_calls = requests["teams"] + requests["activities"]
+    return {
+        "scenario": name,
+        "cycles": len(scans),
+        "open_to_signup_ms": stats["open_to_signup"] * 1000 if stats["open_to_signup"] is not None else None,
+        "requests_per_cycle": api_calls / len(scans) if scans else None,
+        "signup_requests": requests["signup"],
+        "server_errors": requests["errors"],
+        "not_modified": requests["not_modified"],
+        "bytes_received": stats["bytes_sent"],
+        "scan_p50_ms": statistics.median(scans) * 1000 if scans else None,
+        "scan_max_ms": max(scans) * 1000 if scans else None,
+        "cpu_s": cpu,
+        "cpu_per_cycle_ms": cpu / len(scans) * 1000 if scans else None,
+        "rss_start_kb": rss_before,
+        "rss_imported_kb": rss_imported,
+        "rss_peak_kb": peak_rss_kb(),
+    }
+
+
+def _fmt(value, spec):
+    return "-" if value is None else format(value, spec)
+
+
+def print_table(results):
+    columns = [
+        ("scenario", "scenario", 12, ""),
+        ("cycles", "cycles", 6, ""),
+        ("open→signup ms", "open_to_signup_ms", 14, ".1f"),
+        ("req/cycle", "requests_per_cycle", 9, ".1f"),
+        ("KB/cycle", "kb_per_cycle", 8, ".1f"),
+        ("5xx", "server_errors", 5, ""),
+        ("scan p50 ms", "scan_p50_ms", 11, ".1f"),
+        ("scan max ms", "scan_max_ms", 11, ".1f"),
+        ("cpu s", "cpu_s", 7, ".2f"),
+        ("cpu/cycle ms", "cpu_per_cycle_ms", 12, ".1f"),
+        ("peak RSS MB", "rss_peak_mb", 11, ".1f"),
+    ]
+    print("  ".join(title.rjust(width) for title, _, width, _ in columns))
+    for result in results:
+        row = dict(result, rss_peak_mb=result["rss_peak_kb"] / 1024,
+                   kb_per_cycle=result["bytes_received"] / 1024 / result["cycles"] if result["cycles"] else None)
+        print("  ".join(_fmt(row[key], spec).rjust(width) for _, key, width, spec in columns))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Holdsport-bot benchmark mod mock-serveren")
+    parser.add_argument("scenarios", nargs="*", metavar="scenario",
+                        help=f"scenarier der skal køres: {', '.join(SCENARIOS)} (standard: alle)")
+    parser.add_argument("--json", action="store_true", help="skriv resultaterne som JSON")
+    parser.add_argument("--verbose", action="store_true", help="vis bottens log")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(args.child)))
+        return
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"ukendt scenarie: {', '.join(unknown)}")
+
+    results = []
+    for name in args.scenarios or SCENARIOS:
+        completed = subprocess.run(
+            [sys.executable, "-m", "bench.run_benchmark", "--child", name],
+            cwd=ROOT, stdout=subprocess.PIPE, stderr=None if args.verbose else subprocess.DEVNULL, text=True,
+        )
+        if completed.returncode != 0:
+            print(f"❌ {name} fejlede (exit {completed.returncode})", file=sys.stderr)
+            continue
+        results.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_table(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,3 @@
+"""Holdsport-bot: finder aktiviteter på Holdsport og tilmelder automatisk."""
+
+__version__ = "2.0.0"
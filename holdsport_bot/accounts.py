@@ -0,0 +1,288 @@
+import asyncio
+import json
+import os
+import time
+from datetime import datetime
+
+from .holdsport_client import REQUEST_ERRORS, HoldsportClient, activity_key
+from .rules import Rule, RuleSet, team_keys
+from .scheduler import parse_time
+from .state import fingerprint
+from .sync import TeamWindow
+
+# Multi-account settings: a JSON list of accounts in ACCOUNTS_FILE.
+# Without it the bot serves the single HOLDSPORT_USERNAME account.
+ACCOUNTS_FILE = os.getenv("ACCOUNTS_FILE")
+TEAM_CONCURRENCY = int(os.getenv("TEAM_CONCURRENCY", "4"))  # parallel team requests
+
+
+class Account:
+    """Én Holdsport-bruger: login, regler, notifikationsmål og egne tællere"""
+
+    def __init__(self, name, username, password, rules,
+                 telegram_chat_id=None, discord_webhook_url=None):
+        self.name = name
+        self.client = HoldsportClient(username, password)
+        self.rules = rules
+        self.telegram_chat_id = telegram_chat_id
+        self.discord_webhook_url = discord_webhook_url
+        self.successful_signups = 0
+        self.last_error = None
+        # Aktiviteter vi er tilmeldt eller har tilmeldt – dem springer scanningen over
+        self.handled = set()
+        # key -> (fingerprint, matched) for aktiviteter der allerede er undersøgt
+        self.seen = {}
+        self.sniper = None
+        self.store = None
+
+    def set_rules(self, rules):
+        """Skift regler i den kørende proces; returnerer True hvis de ændrede sig.
+
+        Gemte match-resultater gælder de gamle regler, så `seen` nulstilles,
+        og klargjorte tilmeldinger annulleres – næste scanning klargør dem
+        der stadig matcher. `handled` bevares: den er nyere end databasen,
+        hvis skrivninger stadig ligger i køen.
+        """
+        signature = rules.signature()
+        if signature == self.rules.signature():
+            return False
+        self.rules = rules
+        self.seen = {}
+        if self.store:
+            self.store.save_rules_signature(self.name, signature)
+        if self.sniper:
+            self.sniper.cancel_all()
+        return True
+
+    def settings(self):
+        """Login og notifikationsmål – felter der kræver en genstart at ændre"""
+        return {
+            "username": self.client.auth.login,
+            "password": self.client.auth.password,
+            "telegram_chat_id": self.telegram_chat_id,
+            "discord_webhook_url": self.discord_webhook_url,
+        }
+
+    def notification_targets(self):
+        return {"telegram": self.telegram_chat_id, "discord": self.discord_webhook_url}
+
+    def attach_store(self, store):
+        """Genindlæs håndterede og sete aktiviteter fra en StateStore"""
+        self.store = store
+        self.seen, self.handled = store.load_activities(self.name, self.rules.signature())
+
+    def mark_handled(self, activity):
+        key = activity_key(activity)
+        self.handled.add(key)
+        if self.store:
+            self.store.mark_handled(self.name, key)
+
+    def record_signup(self, activity, status_code=None, error=None):
+        if self.store:
+            self.store.record_signup(self.name, activity_key(activity), status_code, error)
+
+    def examine(self, activities, keys):
+        """Returnér matchende, ikke-håndterede aktiviteter.
+
+        Kun nye eller ændrede aktiviteter matches mod reglerne; en uændret
+        aktivitet der ikke matchede sidst, springes over.
+        """
+        found = []
+        for activity in activities:
+            key = activity_key(activity)
+            if key in self.handled:
+                continue
+            fp = fingerprint(activity)
+            known = self.seen.get(key)
+            if known is not None and known[0] == fp:
+                if known[1]:
+                    found.append(activity)
+                continue
+            matched = self.rules.match(activity, keys) is not None
+            self.seen[key] = (fp, matched)
+            if self.store:
+                self.store.record_activity(self.name, key, activity, fp, matched)
+            if matched:
+                found.append(activity)
+        return found
+
+    def watching(self, keys):
+        """Nøgler blandt `keys` der matchede sidst og endnu ikke er håndteret"""
+        return [key for key in keys if key not in self.handled and (self.seen.get(key) or (None, False))[1]]
+
+    def review(self, window, diff, keys):
+        """Som examine, men ud fra et synkroniseret TeamWindow.
+
+        Kun aktiviteter i diffen – eller som kontoen ikke har set før – matches
+        igen; resten afgøres af `seen` uden at beregne fingerprints.
+        """
+        for activity in diff.removed:
+            self.seen.pop(activity_key(activity), None)
+        changed = {activity_key(activity) for activity in diff.new + diff.changed}
+
+        found, pending = [], []
+        for key, activity in window.activities.items():
+            if key in self.handled:
+                continue
+            known = self.seen.get(key)
+            if known is None or key in changed:
+                pending.append(activity)
+            elif known[1]:
+                found.append(activity)
+        return found + self.examine(pending, keys)
+
+    def __repr__(self):
+        return f"Account({self.name!r})"
+
+
+def _read_accounts_file(path):
+    with open(path, encoding="utf-8") as f:
+        raw = json.load(f)
+    if not raw:
+        raise ValueError(f"{path} indeholder ingen konti")
+    return raw
+
+
+def _entry_rules(entry, default_rules):
+    if entry.get("rules"):
+        return RuleSet.from_config(entry["rules"])
+    if entry.get("activity_name"):
+        return RuleSet([Rule(name=entry["activity_name"])])
+    return default_rules
+
+
+def load_accounts(username, password, default_rules, telegram_chat_id=None, discord_webhook_url=None):
+    if not ACCOUNTS_FILE:
+        return [Account(username or "default", username, password, default_rules,
+                        telegram_chat_id, discord_webhook_url)]
+
+    accounts = []
+    for entry in _read_accounts_file(ACCOUNTS_FILE):
+        accounts.append(Account(
+            entry.get("name") or entry["username"],
+            entry["username"],
+            entry["password"],
+            _entry_rules(entry, default_rules),
+            entry.get("telegram_chat_id", telegram_chat_id),
+            entry.get("discord_webhook_url", discord_webhook_url),
+        ))
+    return accounts
+
+
+def load_account_config(default_rules, telegram_chat_id=None, discord_webhook_url=None,
+                        accounts_file=ACCOUNTS_FILE):
+    """{kontonavn: (RuleSet, settings)} til genindlæsning; None når der ikke er en ACCOUNTS_FILE.
+
+    `settings` er som Account.settings() – login og notifikationsmål, som
+    stadig kræver en genstart at ændre.
+    """
+    if not accounts_file:
+        return None
+    try:
+        return {
+            entry.get("name") or entry["username"]: (_entry_rules(entry, default_rules), {
+                "username": entry["username"],
+                "password": entry["password"],
+                "telegram_chat_id": entry.get("telegram_chat_id", telegram_chat_id),
+                "discord_webhook_url": entry.get("discord_webhook_url", discord_webhook_url),
+            })
+            for entry in _read_accounts_file(accounts_file)
+        }
+    except KeyError as e:
+        raise ValueError(f"{accounts_file}: en konto mangler {e}") from None
+
+
+async def scan(accounts, start_date, end_date, concurrency=None, windows=None):
+    """Find matchende, ikke-håndterede aktiviteter for alle konti.
+
+    Hvert hold hentes én gang med den første konto på holdet ("scout").
+    Andre konti på holdet henter kun deres egen udgave – som bærer deres
+    egen tilmeldingsstatus og actions – når scoutens liste indeholder et
+    match de ikke allerede har håndteret.
+
+    Med `windows` (team_id -> TeamWindow, bevares mellem kald) henter
+    scouten kun de dage TeamWindow.plan udpeger, og andre konti kun
+    dagene med deres matches.
+
+    Returnerer {account: (matches, errors)}, hvor matches er
+    (team_name, activity) og errors er (kilde, exception).
+    """
+    results = {account: ([], []) for account in accounts}
+    semaphore = asyncio.Semaphore(max(1, concurrency or TEAM_CONCURRENCY))
+
+    teams_per_account = await asyncio.gather(
+        *(account.client.get_teams() for account in accounts), return_exceptions=True
+    )
+    members = {}
+    for account, teams in zip(accounts, teams_per_account):
+        if isinstance(teams, BaseException):
+            if not isinstance(teams, REQUEST_ERRORS):
+                raise teams
+            results[account][1].append(("/teams", teams))
+            continue
+        for team in teams:
+            members.setdefault(team["id"], (team, []))[1].append(account)
+
+    async def fetch(team, account, first=start_date, last=end_date):
+        async with semaphore:
+            try:
+                return await account.client.get_activities(team["id"], first, last), None
+            except REQUEST_ERRORS as e:
+                return None, e
+
+    async def sync(team, team_members):
+        window = windows.setdefault(team["id"], TeamWindow())
+        start, end = start_date.date(), end_date.date()
+        watched = [key for account in team_members for key in account.watching(window.activities)]
+        ranges, full = window.plan(start, end, time.monotonic(), datetime.now().astimezone(), watched)
+        fetched = await asyncio.gather(*(fetch(team, team_members[0], first, last) for first, last in ranges))
+        for _, error in fetched:
+            if error:
+                return None, error
+        diff = window.apply([(r, activities) for r, (activities, _) in zip(ranges, fetched)],
+                            start, end, time.monotonic(), full)
+        return (window, diff), None
+
+    async def scan_team(team, team_members):
+        scout = team_members[0]
+        if windows is None:
+            snapshot, error = await fetch(team, scout)
+        else:
+            snapshot, error = await sync(team, team_members)
+        if error:
+            for account in team_members:
+                results[account][1].append((team["name"], error))
+            return
+
+        keys = team_keys(team)
+        for account in team_members:
+            if windows is None:
+                found = account.examine(snapshot, keys)
+            else:
+                found = account.review(*snapshot, keys)
+            if found and account is not scout:
+                if windows is None:
+                    own, error = await fetch(team, account)
+                else:
+                    days = [parse_time(activity.get("starttime")) for activity in found]
+                    days = [day.date() for day in days if day] or [start_date.date()]
+                    own, error = await fetch(team, account, min(days), max(days))
+                if error:
+                    results[account][1].append((team["name"], error))
+                    continue
+                found = account.examine(own, keys)
+            results[account][0].extend((team["name"], activity) for activity in found)
+
+    await asyncio.gather(*(scan_team(team, team_members) for team, team_members in members.values()))
+    return results
+
+
+def totals(accounts):
+    """Summér API-kald og cache-tællere på tværs af konti"""
+    caches = [account.client.cache for account in accounts]
+    return {
+        "requests": sum(account.client.request_count for account in accounts),
+        "hits": sum(cache.hits for cache in caches),
+        "revalidated": sum(cache.revalidated for cache in caches),
+        "misses": sum(cache.misses for cache in caches),
+    }
@@ -0,0 +1,193 @@
+import codecs
+import json
+
+from .scheduler import REGISTRATION_HINT_FIELDS
+
+READ_CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = " \t\n\r"
+_SCALAR_END = _WHITESPACE + ",]"
+_HINT_FIELDS = frozenset(REGISTRATION_HINT_FIELDS)
+_ACTIONS = {}
+
+
+def _action_name(action):
+    return str((action.get("activities_user") or {}).get("name", "")).lower()
+
+
+class Activity:
+    """Kompakt aktivitet med kun de felter botten bruger.
+
+    Holdsport sender mange flere felter pr. aktivitet (kommentarer, klub,
+    deltagere, ...). Dem gemmer vi ikke. `get` virker som på den rå dict,
+    så regler, scheduler og state ikke skal kende forskel; `actions` er dog
+    kun navnene på brugerens handlinger, fx ("tilmeld",).
+    """
+
+    __slots__ = ("id", "name", "starttime", "place", "status", "action_path", "action_method", "actions", "hints")
+
+    FIELDS = __slots__[:-1]
+    _FIELD_SET = frozenset(FIELDS)
+
+    def __init__(self, id=None, name=None, starttime=None, place=None, status=None,
+                 action_path=None, action_method=None, actions=(), hints=()):
+        self.id = id
+        self.name = name
+        self.starttime = starttime
+        self.place = place
+        self.status = status
+        self.action_path = action_path
+        self.action_method = action_method
+        self.actions = actions
+        self.hints = hints  # ((felt, værdi), ...) for de tilmeldingshint der er sat
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        actions = get("actions")
+        if actions:
+            actions = tuple([_action_name(action) for action in actions if isinstance(action, dict)])
+            # De samme få kombinationer går igen – del tuplerne
+            if len(_ACTIONS) < 64:
+                actions = _ACTIONS.setdefault(actions, actions)
+        else:
+            actions = ()
+        hints = ()
+        if not _HINT_FIELDS.isdisjoint(data):
+            hints = tuple([(field, data[field]) for field in REGISTRATION_HINT_FIELDS if get(field)])
+        return cls(get("id"), get("name"), get("starttime"), get("place"), get("status"),
+                   get("action_path"), get("action_method"), actions, hints)
+
+    def get(self, field, default=None):
+        if field in Activity._FIELD_SET:
+            value = getattr(self, field)
+        else:
+            value = dict(self.hints).get(field) if self.hints else None
+        return default if value is None else value
+
+    def __getitem__(self, field):
+        value = self.get(field)
+        if value is None:
+            raise KeyError(field)
+        return value
+
+    def to_dict(self):
+        data = {field: getattr(self, field) for field in Activity.FIELDS}
+        data["actions"] = list(self.actions)
+        data.update(self.hints)
+        return data
+
+    def _values(self):
+        return tuple(getattr(self, field) for field in Activity.__slots__)
+
+    def __eq__(self, other):
+        if not isinstance(other, Activity):
+            return NotImplemented
+        return self._values() == other._values()
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Activity(id={self.id!r}, name={self.name!r}, starttime={self.starttime!r})"
+
+
+class ActivityParser:
+    """Inkrementel parser for en JSON-liste af aktiviteter.
+
+    `feed` tager bytes i vilkårlige bidder og returnerer de aktiviteter der
+    blev færdige. Kun elementerne fra den aktuelle bid findes som dicts,
+    før de erstattes af Activity-objekter – hverken hele svaret eller hele
+    træet ligger i hukommelsen på én gang.
+    """
+
+    def __init__(self, factory=Activity.from_dict):
+        self.factory = factory
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._started = False
+        self._done = False
+        self._expect_value = True
+
+    def feed(self, chunk, final=False):
+        self._buffer += self._text.decode(chunk, final)
+        found = []
+        scan_once, factory = self._decoder.scan_once, self.factory
+        buffer, pos, size = self._buffer, 0, len(self._buffer)
+        batch = True
+        while True:
+            while pos < size and buffer[pos] in _WHITESPACE:
+                pos += 1
+            if pos >= size:
+                break
+            char = buffer[pos]
+            if self._done:
+                raise ValueError(f"uventet data efter listen ved position {pos}")
+            if not self._started:
+                if char != "[":
+                    raise ValueError("forventede en JSON-liste af aktiviteter")
+                self._started = True
+                pos += 1
+            elif char == "]":
+                self._done = True
+                pos += 1
+            elif not self._expect_value:
+                if char != ",":
+                    raise ValueError(f"forventede ',' eller ']' ved position {pos}")
+                self._expect_value = True
+                pos += 1
+            else:
+                # Hurtig vej: alle hele elementer frem til sidste "}," i én json.loads.
+                # Lykkes den, er udsnittet netop hele elementer; ellers ét ad gangen.
+                cut = buffer.rfind("},", pos) + 1 if batch else 0
+                if cut > pos:
+                    try:
+                        items = json.loads(f"[{buffer[pos:cut]}]")
+                    except ValueError:
+                        batch = False
+                    else:
+                        found.extend(factory(item) for item in items if isinstance(item, dict))
+                        self._expect_value = False
+                        pos = cut
+                        continue
+                try:
+                    item, end = scan_once(buffer, pos)
+                except (json.JSONDecodeError, StopIteration):
+                    if final:
+                        raise ValueError(f"ugyldig aktivitet ved position {pos}") from None
+                    break  # elementet er ikke kommet helt endnu
+                if (not final and not isinstance(item, (dict, list))
+                        and (end >= size or buffer[end] not in _SCALAR_END)):
+                    break  # et tal kan fortsætte i næste bid ("3" + ".5", "1" + "e3")
+                if isinstance(item, dict):
+                    found.append(factory(item))
+                self._expect_value = False
+                pos = end
+        self._buffer = buffer[pos:]
+        return found
+
+    def close(self):
+        found = self.feed(b"", final=True)
+        if not self._done:
+            raise ValueError("JSON-listen af aktiviteter sluttede for tidligt")
+        return found
+
+
+def parse_activities(body, chunk_size=READ_CHUNK_SIZE):
+    """Parse et helt svar (bytes) – i bidder, som hvis det kom fra netværket"""
+    parser = ActivityParser()
+    activities = []
+    for start in range(0, len(body), chunk_size):
+        activities.extend(parser.feed(body[start:start + chunk_size]))
+    activities.extend(parser.close())
+    return activities
+
+
+async def read_activities(response):
+    """Læs en aiohttp-response med en aktivitetsliste, mens den ankommer"""
+    parser = ActivityParser()
+    activities = []
+    async for chunk in response.content.iter_chunked(READ_CHUNK_SIZE):
+        activities.extend(parser.feed(chunk))
+    activities.extend(parser.close())
+    return activities
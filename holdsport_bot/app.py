@@ -0,0 +1,555 @@
+import os
+import sys
+import time
+import logging
+from datetime import datetime, timedelta
+import asyncio
+from functools import partial
+
+# Load environment variables before the modules below read their settings
+from . import config
+config.load_env()
+
+from . import accounts, leader, logs, metrics, rules, scheduler
+from .events import EVENTS
+from .holdsport_client import REQUEST_ERRORS, close_shared_session, expect_opening
+from .notifications import DiscordChannel, Notifier, TelegramChannel
+from .resilience import BREAKER_OPENING_WINDOW, ERROR_BACKOFF_BASE, ERROR_BACKOFF_MAX, backoff_delay
+from .sniper import Sniper
+from .state import STATE_DB, StateStore
+
+logs.setup_logging()
+logger = logging.getLogger("holdsport")
+
+USERNAME = os.getenv("HOLDSPORT_USERNAME")
+PASSWORD = os.getenv("HOLDSPORT_PASSWORD")
+PING_INTERVAL = int(os.getenv("PING_INTERVAL", "300"))  # 5 minutes in seconds
+
+
+def read_settings():
+    """Indstillingerne der kan genindlæses uden genstart, læst og valideret fra miljøet"""
+    settings = {
+        "ACTIVITY_NAME": os.getenv("HOLDSPORT_ACTIVITY_NAME", "Herre 4 træning").strip().lower(),
+        "DAYS_AHEAD": int(os.getenv("DAYS_AHEAD", "7")),
+        "CHECK_INTERVAL": int(os.getenv("CHECK_INTERVAL", "180")),
+        "STATUS_INTERVAL": int(os.getenv("STATUS_INTERVAL", "43200")),  # 12 hours in seconds
+        "STATUS_REPORT_TTL": float(os.getenv("STATUS_REPORT_TTL", "30")),  # seconds a cached /status stays valid
+    }
+    if settings["DAYS_AHEAD"] < 0:
+        raise ValueError("DAYS_AHEAD må ikke være negativ")
+    if settings["CHECK_INTERVAL"] <= 0 or settings["STATUS_INTERVAL"] <= 0:
+        raise ValueError("CHECK_INTERVAL og STATUS_INTERVAL skal være positive")
+    return settings
+
+
+# Environment variables apply_config picks up on a reload; everything else needs a restart
+RELOADABLE = frozenset({
+    "HOLDSPORT_ACTIVITY_NAME", "DAYS_AHEAD", "CHECK_INTERVAL", "STATUS_INTERVAL", "STATUS_REPORT_TTL",
+    "HOLDSPORT_RULES", "RULES_FILE",
+})
+_settings = read_settings()
+ACTIVITY_NAME = _settings["ACTIVITY_NAME"]
+DAYS_AHEAD = _settings["DAYS_AHEAD"]
+CHECK_INTERVAL = _settings["CHECK_INTERVAL"]
+STATUS_INTERVAL = _settings["STATUS_INTERVAL"]
+STATUS_REPORT_TTL = _settings["STATUS_REPORT_TTL"]
+
+# Profile: "cloud" (Render: HTTP server + self-ping) or "pi" (Telegram commands + restart).
+# Each feature can be switched on or off on its own; disabled features are never imported.
+BOT_PROFILE = os.getenv("BOT_PROFILE", "cloud").strip().lower()
+IS_PI = BOT_PROFILE == "pi"
+TELEGRAM_COMMANDS = os.getenv("TELEGRAM_COMMANDS", str(IS_PI)).strip().lower() in ("1", "true", "yes")
+ALLOW_RESTART = os.getenv("ALLOW_RESTART", str(IS_PI)).strip().lower() in ("1", "true", "yes")
+# Public URL Telegram posts updates to; set it to use webhook instead of long polling
+TELEGRAM_WEBHOOK_URL = os.getenv("TELEGRAM_WEBHOOK_URL")
+TELEGRAM_WEBHOOK_PATH = os.getenv("TELEGRAM_WEBHOOK_PATH", "/telegram")
+TELEGRAM_WEBHOOK_SECRET = os.getenv("TELEGRAM_WEBHOOK_SECRET")  # default derived from the bot token
+WEBHOOK_MODE = TELEGRAM_COMMANDS and bool(TELEGRAM_WEBHOOK_URL)
+HTTP_SERVER = os.getenv("HTTP_SERVER", str(WEBHOOK_MODE or not IS_PI)).strip().lower() in ("1", "true", "yes")
+SELF_PING = os.getenv("SELF_PING", str(HTTP_SERVER and not IS_PI)).strip().lower() in ("1", "true", "yes")
+DASHBOARD = os.getenv("DASHBOARD", str(HTTP_SERVER)).strip().lower() in ("1", "true", "yes")
+# /profile, /memory and /slow for the admin; the HTTP routes also need DEBUG_TOKEN
+PROFILING = os.getenv("PROFILING", "true").strip().lower() in ("1", "true", "yes")
+PORT = int(os.getenv("PORT", "10000"))
+# Reload when .env, RULES_FILE or ACCOUNTS_FILE changes; SIGHUP and /reload always work
+CONFIG_WATCH_INTERVAL = float(os.getenv("CONFIG_WATCH_INTERVAL", "5"))  # seconds between checks, 0 = off
+
+# Telegram settings
+TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
+TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
+TELEGRAM_ADMIN_ID = int(os.getenv("TELEGRAM_ADMIN_ID", "6052252183"))
+
+# Discord settings
+DISCORD_WEBHOOK_URL = os.getenv("DISCORD_WEBHOOK_URL")
+
+RULES = rules.load_rules(ACTIVITY_NAME)
+
+notifier = Notifier()
+if TELEGRAM_BOT_TOKEN:
+    notifier.register(TelegramChannel(TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID))
+else:
+    logger.warning("⚠️ Telegram credentials not configured")
+
+# Global status tracking
+status = {
+    "start_time": datetime.now(),
+    "last_check": None,
+    "total_checks": 0,
+    "successful_signups": 0,
+    "last_error": None,
+    "last_scan_duration": None,
+    "failed_scans": 0,
+    "is_running": True,
+    "restart": False
+}
+# Sat af stop_bot, så hovedløkken ikke sover videre efter /stop eller /restart
+stopping = asyncio.Event()
+
+def stop_bot(restart=False):
+    """Stop (og evt. genstart) botten; vækker hovedløkken med det samme"""
+    status["restart"] = status["restart"] or restart
+    status["is_running"] = False
+    stopping.set()
+
+async def unless_stopped(awaitable):
+    """Vent på `awaitable`, men giv op når botten stoppes; returnerer resultatet eller None"""
+    waiter = asyncio.ensure_future(awaitable)
+    stopped = asyncio.ensure_future(stopping.wait())
+    try:
+        await asyncio.wait((waiter, stopped), return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for future in (waiter, stopped):
+            future.cancel()
+    return waiter.result() if waiter.done() and not waiter.cancelled() else None
+
+def log_message(message, level=logging.INFO):
+    logger.log(level, message)
+
+def generate_status_report():
+    uptime = datetime.now() - status["start_time"]
+    hours = uptime.total_seconds() / 3600
+    totals = accounts.totals(ACCOUNTS)
+    report = f"""
+📊 Holdsport Bot Status Report
+⏱️ Uptime: {hours:.1f} hours
+🔄 Total checks: {status["total_checks"]}
+✅ Successful signups: {status["successful_signups"]}
+⏰ Last check: {status["last_check"].strftime('%Y-%m-%d %H:%M:%S') if status["last_check"] else "Never"}
+⚡ Last scan: {f'{status["last_scan_duration"]:.2f}s' if status["last_scan_duration"] is not None else "Never"}
+🌐 API calls: {totals["requests"]}
+🗄️ Cache: {totals["hits"]} hits, {totals["revalidated"]} revalidated, {totals["misses"]} misses
+📨 Notifications: {notifier.summary()}
+"""
+    if COORDINATOR:
+        report += f"👑 Role: {COORDINATOR.role} ({COORDINATOR.instance_id})\n"
+    if status["last_error"]:
+        report += f"❌ Last error: {status['last_error']}\n"
+    if len(ACCOUNTS) > 1:
+        for account in ACCOUNTS:
+            report += f"👤 {account.name}: {account.successful_signups} signups\n"
+    return report
+
+_report_cache = {"text": None, "until": 0.0}
+
+def cached_status_report():
+    """Statusrapporten til kommandoer; genberegnes højst hvert STATUS_REPORT_TTL sekund"""
+    now = time.monotonic()
+    if _report_cache["text"] is None or now >= _report_cache["until"]:
+        _report_cache["text"] = generate_status_report()
+        _report_cache["until"] = now + STATUS_REPORT_TTL
+    return _report_cache["text"]
+
+# Matchede, ikke-håndterede aktiviteter fra seneste scanning, til dashboardet
+upcoming = []
+
+def dashboard_snapshot():
+    """Dashboardets tilstand ud fra det botten allerede ved – kalder aldrig Holdsport"""
+    totals = accounts.totals(ACCOUNTS)
+    return {
+        "status": {
+            "Profil": BOT_PROFILE,
+            "Rolle": f"{COORDINATOR.role} ({COORDINATOR.instance_id})" if COORDINATOR else None,
+            "Oppe siden": status["start_time"].strftime('%Y-%m-%d %H:%M:%S'),
+            "Tjek i alt": status["total_checks"],
+            "Tilmeldinger": status["successful_signups"],
+            "Sidste tjek": status["last_check"].strftime('%Y-%m-%d %H:%M:%S') if status["last_check"] else None,
+            "Sidste scanning": f'{status["last_scan_duration"]:.2f}s' if status["last_scan_duration"] is not None else None,
+            "Fejlede scanninger i træk": status["failed_scans"],
+            "API-kald": totals["requests"],
+            "Notifikationer": notifier.summary(),
+            "Sidste fejl": status["last_error"],
+        },
+        "upcoming": upcoming,
+    }
+
+def invalidate_status_report():
+    _report_cache["text"] = None
+
+async def send_status_update():
+    while status["is_running"]:
+        try:
+            # Kun lederen rapporterer, så redundante instanser ikke sender den samme status
+            if is_leader():
+                notifier.notify(generate_status_report())
+        except Exception as e:
+            log_message(f"Error sending status update: {e}", logging.ERROR)
+        sent_at = time.monotonic()
+        # Et nyt STATUS_INTERVAL gælder med det samme, ikke først efter den gamle ventetid
+        while await RELOADER.wait(sent_at + STATUS_INTERVAL - time.monotonic()):
+            pass
+
+ACCOUNTS = accounts.load_accounts(USERNAME, PASSWORD, RULES, TELEGRAM_CHAT_ID, DISCORD_WEBHOOK_URL)
+STORE = StateStore(STATE_DB) if STATE_DB else None
+# team_id -> sync.TeamWindow; bevares mellem scanninger, så kun varme og nye dage hentes
+TEAM_WINDOWS = {}
+
+if DISCORD_WEBHOOK_URL or any(account.discord_webhook_url for account in ACCOUNTS):
+    notifier.register(DiscordChannel(DISCORD_WEBHOOK_URL))
+
+def on_leadership_change(is_leader):
+    if not is_leader:
+        # Lederen har nu en anden instans – dens tilmeldinger må ikke også affyres herfra
+        for account in ACCOUNTS:
+            account.sniper.cancel_all()
+    message = f"👑 {COORDINATOR.instance_id} er nu {'leder' if is_leader else 'standby'}"
+    log_message(message, logging.INFO if is_leader else logging.WARNING)
+    notifier.notify(message)
+    EVENTS.publish("leader", instance=COORDINATOR.instance_id, leader=is_leader)
+    invalidate_status_report()
+
+_lease_backend = leader.load_backend()
+COORDINATOR = leader.Coordinator(_lease_backend, on_change=on_leadership_change) if _lease_backend else None
+
+def is_leader():
+    return COORDINATOR is None or COORDINATOR.is_leader
+
+def lifetime_counters():
+    counters = {"total_checks": status["total_checks"], "successful_signups": status["successful_signups"]}
+    for account in ACCOUNTS:
+        counters[f"successful_signups:{account.name}"] = account.successful_signups
+    return counters
+
+if STORE:
+    saved = STORE.load_counters()
+    status["total_checks"] = saved.get("total_checks", 0)
+    status["successful_signups"] = saved.get("successful_signups", 0)
+    for account in ACCOUNTS:
+        account.attach_store(STORE)
+        account.successful_signups = saved.get(f"successful_signups:{account.name}", 0)
+
+def apply_config(changed):
+    """Valider og anvend genindlæst konfiguration; ved en fejl ændres intet.
+
+    Forbindelser, caches, synkroniserede vinduer og tællere bevares.
+    """
+    global RULES
+    settings = read_settings()
+    default_rules = rules.load_rules(settings["ACTIVITY_NAME"], os.getenv("RULES_FILE"), os.getenv("HOLDSPORT_RULES"))
+    per_account = accounts.load_account_config(default_rules, TELEGRAM_CHAT_ID, DISCORD_WEBHOOK_URL)
+    if per_account is not None:
+        missing = [account.name for account in ACCOUNTS if account.name not in per_account]
+        if missing:
+            raise ValueError(f"konti kan ikke fjernes uden genstart: {', '.join(missing)}")
+
+    # Alt er læst og valideret – herfra anvendes det uden await
+    updated = [f"{name}={value}" for name, value in settings.items() if globals()[name] != value]
+    if settings["DAYS_AHEAD"] < DAYS_AHEAD:
+        # Aktiviteter uden for det kortere vindue må ikke blive hængende til næste fulde synkronisering
+        TEAM_WINDOWS.clear()
+    globals().update(settings)
+    RULES = default_rules
+    for account in ACCOUNTS:
+        if account.set_rules(per_account[account.name][0] if per_account is not None else default_rules):
+            updated.append(f"regler for {account.name}")
+            log_message(f"📋 Regler for {account.name}: {account.rules.describe()}")
+    invalidate_status_report()
+
+    restart = sorted(changed - RELOADABLE)
+    if per_account is not None:
+        if per_account.keys() - {account.name for account in ACCOUNTS}:
+            restart.append("nye konti")
+        for account in ACCOUNTS:
+            current, wanted = account.settings(), per_account[account.name][1]
+            # Kun feltnavnene – aldrig værdierne, som kan være adgangskoder
+            restart += [f"{field} for {account.name}" for field in current if current[field] != wanted[field]]
+    EVENTS.publish("reload", updated=updated, restart=restart)
+    message = ", ".join(updated) if updated else "ingen ændringer"
+    if restart:
+        message += f" – kræver genstart: {', '.join(restart)}"
+    return message
+
+def config_files():
+    return [path for path in (config.dotenv_path(), os.getenv("RULES_FILE"), accounts.ACCOUNTS_FILE) if path]
+
+RELOADER = config.Reloader(apply_config, config_files)
+
+def is_signup_action_safe(activity):
+    """Sikrer at vi *kun* tilmelder os aktiviteter – aldrig afmelder eller ændrer"""
+    return "tilmeld" in activity.actions
+
+async def handle_signup_result(account, activity, status_code):
+    if status_code in [200, 201]:
+        success_message = f"🎉 Succes! Du er nu tilmeldt {activity.get('name', 'Herre 4 træning')}.\n" \
+                        f"📅 Dato: {activity.get('starttime', 'Ukendt')}\n" \
+                        f"📍 Lokation: {activity.get('place', 'Ukendt')}"
+        log_message(success_message)
+        opens_at = scheduler.registration_opens_at(activity)
+        if opens_at:
+            since_open = (datetime.now().astimezone() - opens_at).total_seconds()
+            log_message(f"⏱️ Tilmeldt {since_open:.1f}s efter tilmeldingen åbnede")
+            metrics.TIME_TO_SIGNUP.observe(max(0.0, since_open))
+        notifier.notify(success_message, account.notification_targets())
+        EVENTS.publish("signup", account=account.name, name=activity.get("name"), ok=True, status_code=status_code)
+        account.mark_handled(activity)
+        account.record_signup(activity, status_code)
+        account.successful_signups += 1
+        status["successful_signups"] += 1
+        invalidate_status_report()
+        return True
+    else:
+        error_msg = f"❌ Tilmelding fejlede for {account.name} – statuskode {status_code}"
+        log_message(error_msg, logging.ERROR)
+        account.record_signup(activity, status_code)
+        status["last_error"] = account.last_error = error_msg
+        EVENTS.publish("signup", account=account.name, name=activity.get("name"), ok=False, status_code=status_code)
+        return False
+
+async def signup_for_activity(account, activity):
+    if not is_leader():
+        log_message("⏸️ Ikke leder længere – springer tilmeldingen over.", logging.WARNING)
+        return False
+    if not is_signup_action_safe(activity):
+        log_message("⛔ Ingen sikker tilmeldingshandling fundet – springer over.")
+        return False
+    try:
+        status_code = await account.client.signup(activity)
+    except REQUEST_ERRORS as e:
+        error_msg = f"[Fejl] Ved tilmelding for {account.name}: {e}"
+        log_message(error_msg, logging.ERROR)
+        account.record_signup(activity, error=str(e))
+        status["last_error"] = account.last_error = error_msg
+        EVENTS.publish("signup", account=account.name, name=activity.get("name"), ok=False, error=str(e))
+        return False
+    return await handle_signup_result(account, activity, status_code)
+
+for account in ACCOUNTS:
+    account.sniper = Sniper(account.client, partial(handle_signup_result, account), guard=is_leader)
+
+async def handle_matches(account, matches):
+    # Klargør tilmelding til aktiviteter hvor vi kender åbningstidspunktet
+    for team_name, activity in matches:
+        opens_at = scheduler.registration_opens_at(activity)
+        if opens_at and is_signup_action_safe(activity) and str(activity.get("status", "")).lower() != "tilmeldt":
+            if account.sniper.arm(activity, opens_at):
+                EVENTS.publish("armed", account=account.name, name=activity.get("name"), team=team_name,
+                               opens_at=opens_at.isoformat())
+    to_signup = []
+    for team_name, activity in matches:
+        if account.sniper.is_armed(activity):
+            continue
+        logger.info("✅ Fundet aktivitet for %s: %s på holdet %s", account.name, activity.name, team_name)
+        EVENTS.publish("match", account=account.name, name=activity.get("name"), team=team_name,
+                       starttime=activity.get("starttime"))
+        logger.debug("  ➤ Starttid: %s", activity.get('starttime', 'Ukendt'))
+        logger.debug("  ➤ Lokation: %s", activity.get('place', 'Ukendt'))
+        status["last_check"] = datetime.now()
+        status["total_checks"] += 1
+        activity_status = str(activity.get("status", "")).lower()
+        if activity_status == "tilmeldt":
+            log_message("ℹ️ Du er allerede tilmeldt.")
+            account.mark_handled(activity)
+        else:
+            to_signup.append(activity)
+    if to_signup:
+        log_message(f"🟡 Forsøger at tilmelde {account.name} til {len(to_signup)} aktivitet(er)...")
+        await asyncio.gather(*(signup_for_activity(account, activity) for activity in to_signup))
+
+def upcoming_entry(account, team_name, activity):
+    opens_at = scheduler.registration_opens_at(activity)
+    return {
+        "account": account.name,
+        "team": team_name,
+        "name": activity.get("name"),
+        "starttime": activity.get("starttime"),
+        "opens_at": opens_at.isoformat() if opens_at else None,
+        "armed": account.sniper.is_armed(activity),
+    }
+
+def expect_next_opening(activities):
+    """Fortæl afbryderne om den nærmeste tilmeldingsåbning, så en pause aldrig dækker den"""
+    since = datetime.now().astimezone() - timedelta(seconds=BREAKER_OPENING_WINDOW)
+    openings = [opens_at for opens_at in map(scheduler.registration_opens_at, activities)
+                if opens_at and opens_at >= since]
+    if openings:
+        expect_opening(min(openings))
+
+async def fetch_activities():
+    global upcoming
+    scan_start = time.monotonic()
+    pending = []
+    failed = False
+    errors = 0
+    try:
+        today = datetime.now()
+        end_date = today + timedelta(days=DAYS_AHEAD)
+        results = await accounts.scan(ACCOUNTS, today, end_date, windows=TEAM_WINDOWS)
+        for account, (matches, account_errors) in results.items():
+            for source, error in account_errors:
+                error_msg = f"[Fejl] API-kald fejlede for {account.name} ({source}): {error}"
+                log_message(error_msg, logging.WARNING)
+                status["last_error"] = account.last_error = error_msg
+                EVENTS.publish("error", message=error_msg)
+                failed = True
+                errors += 1
+            pending.extend(activity for _, activity in matches)
+        upcoming = [upcoming_entry(account, team_name, activity)
+                    for account, (matches, _) in results.items() for team_name, activity in matches]
+        expect_next_opening(pending)
+        await asyncio.gather(*(handle_matches(account, matches) for account, (matches, _) in results.items()))
+    except REQUEST_ERRORS as e:
+        error_msg = f"[Fejl] API-kald fejlede: {e}"
+        log_message(error_msg, logging.ERROR)
+        status["last_error"] = error_msg
+        EVENTS.publish("error", message=error_msg)
+        failed = True
+        errors += 1
+    except Exception:
+        # Også uventede fejl (fx et svar der ikke er JSON) tæller som en fejlet
+        # scanning, så backoff vokser i stedet for at starte forfra
+        failed = True
+        errors += 1
+        raise
+    finally:
+        status["failed_scans"] = status["failed_scans"] + 1 if failed else 0
+        status["last_scan_duration"] = time.monotonic() - scan_start
+        metrics.SCAN_DURATION.observe(status["last_scan_duration"])
+        logger.info("⏱️ Scanning af %d konto(er) tog %.2fs", len(ACCOUNTS), status["last_scan_duration"])
+        invalidate_status_report()
+        EVENTS.publish("scan", duration=status["last_scan_duration"], matches=len(pending), errors=errors)
+        if EVENTS.subscribers:  # snapshottet koster en gennemgang af alle konti
+            EVENTS.broadcast("state", dashboard_snapshot())
+        if STORE:
+            STORE.save_counters(lifetime_counters())
+    return pending
+
+async def start_features(cleanups):
+    """Start de features profilen har slået til; modulerne importeres først her.
+
+    Returnerer baggrunds-tasks; nedlukning af andet lægges i `cleanups`.
+    """
+    tasks = []
+    telegram_app = None
+    profiler = None
+    if PROFILING and (TELEGRAM_COMMANDS or HTTP_SERVER):
+        from . import profiling
+        profiler = profiling.Profiler()
+    if TELEGRAM_COMMANDS and not TELEGRAM_BOT_TOKEN:
+        log_message("Telegram bot token not set, command listener not started.", logging.WARNING)
+    elif TELEGRAM_COMMANDS:
+        from . import telegram_commands
+        if WEBHOOK_MODE:
+            telegram_app = telegram_commands.build_application(
+                TELEGRAM_BOT_TOKEN, TELEGRAM_ADMIN_ID, stop_bot, cached_status_report, ALLOW_RESTART, polling=False,
+                profiler=profiler, reload=RELOADER.reload,
+            )
+        else:
+            tasks.append(asyncio.create_task(telegram_commands.listen(
+                TELEGRAM_BOT_TOKEN, TELEGRAM_ADMIN_ID, stop_bot, cached_status_report, ALLOW_RESTART,
+                profiler=profiler, reload=RELOADER.reload,
+            )))
+
+    if HTTP_SERVER:
+        from . import http_server
+        web_app = http_server.create_app()
+        if DASHBOARD:
+            from . import dashboard
+            # Dashboardet viser kontonavne, aktiviteter og fejl – aldrig uden token
+            if dashboard.DASHBOARD_TOKEN:
+                dashboard.mount(web_app, EVENTS, dashboard_snapshot)
+            else:
+                log_message("DASHBOARD kræver DASHBOARD_TOKEN – dashboardet er ikke startet", logging.WARNING)
+        if profiler is not None and profiling.DEBUG_TOKEN:
+            profiling.mount(web_app, profiler)
+        if telegram_app is not None:
+            secret = TELEGRAM_WEBHOOK_SECRET or telegram_commands.webhook_secret(TELEGRAM_BOT_TOKEN)
+            telegram_commands.mount_webhook(web_app, telegram_app, TELEGRAM_WEBHOOK_PATH, secret)
+        runner = await http_server.start(web_app, PORT)
+        cleanups.append(runner.cleanup)
+        tasks.append(asyncio.create_task(metrics.monitor_event_loop()))
+        if SELF_PING:
+            tasks.append(asyncio.create_task(http_server.self_ping(PORT, PING_INTERVAL, status)))
+        if telegram_app is not None:
+            url = TELEGRAM_WEBHOOK_URL.rstrip("/") + TELEGRAM_WEBHOOK_PATH
+            tasks.append(asyncio.create_task(telegram_commands.serve_webhook(telegram_app, url, secret)))
+    elif telegram_app is not None:
+        log_message("TELEGRAM_WEBHOOK_URL kræver HTTP_SERVER – Telegram-kommandoer er ikke startet", logging.WARNING)
+    return tasks
+
+async def main():
+    log_message(f"🤖 Starter Holdsport-bot med tilmelding ({BOT_PROFILE})...")
+    for account in ACCOUNTS:
+        log_message(f"📋 Regler for {account.name}: {account.rules.describe()}")
+    notifier.start()
+    notifier.notify("🚀 Holdsport Bot started on Raspberry Pi!" if IS_PI else "🚀 Holdsport Bot started!")
+    tasks = [asyncio.create_task(send_status_update())]
+    if COORDINATOR:
+        tasks.append(asyncio.create_task(COORDINATOR.run()))
+    cleanups = []
+    RELOADER.install_signal_handler()
+    if CONFIG_WATCH_INTERVAL > 0:
+        tasks.append(asyncio.create_task(RELOADER.watch(CONFIG_WATCH_INTERVAL)))
+    try:
+        tasks.extend(await start_features(cleanups))
+        while status["is_running"]:
+            try:
+                if not is_leader():
+                    log_message(f"⏸️ Standby ({COORDINATOR.instance_id}) – venter på leasen")
+                    await unless_stopped(COORDINATOR.wait_until_leader())
+                    continue
+                logger.debug("🔍 Tjekker Holdsport for aktiviteter...")
+                matches = await fetch_activities()
+                delay, reason = scheduler.next_poll_delay(matches, CHECK_INTERVAL, failures=status["failed_scans"])
+                logger.info("💤 Næste tjek om %.0fs (%s)", delay, reason)
+                if await unless_stopped(RELOADER.wait(delay)):
+                    logger.info("🔁 Ny konfiguration – tjekker med det samme")
+            except Exception as e:
+                error_msg = f"Uventet fejl: {e}"
+                log_message(error_msg, logging.ERROR)
+                status["last_error"] = error_msg
+                EVENTS.publish("error", message=error_msg)
+                # En fejlet scanning er allerede talt med i fetch_activities
+                await unless_stopped(asyncio.sleep(
+                    backoff_delay(max(1, status["failed_scans"]), ERROR_BACKOFF_BASE, ERROR_BACKOFF_MAX)
+                ))
+    except KeyboardInterrupt:
+        status["is_running"] = False
+        notifier.notify("🛑 Holdsport Bot stopped!")
+        log_message("Bot stopped by user")
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for cleanup in cleanups:
+            await cleanup()
+        for account in ACCOUNTS:
+            account.sniper.cancel_all()
+        if status["restart"]:
+            log_message("Restarting Holdsport Bot...")
+            notifier.notify("♻️ Holdsport Bot restarting now!")
+        await notifier.close()
+        await close_shared_session()
+        if STORE:
+            STORE.save_counters(lifetime_counters())
+            STORE.close()
+
+def run():
+    """Entry point for `holdsport-bot`, `python -m holdsport_bot` and the main*.py shims"""
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        # asyncio.run har allerede annulleret main() og kørt oprydningen
+        pass
+    if status["restart"]:
+        # execv springer atexit over, så tøm logkøen først
+        logs.shutdown_logging()
+        os.execv(sys.executable, [sys.executable, "-m", "holdsport_bot", *sys.argv[1:]])
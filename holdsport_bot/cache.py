@@ -0,0 +1,82 @@
+import os
+import time
+
+# Response cache settings
+TEAMS_CACHE_TTL = float(os.getenv("TEAMS_CACHE_TTL", "21600"))  # 6 hours
+ACTIVITIES_CACHE_TTL = float(os.getenv("ACTIVITIES_CACHE_TTL", "0"))  # 0 = always revalidate
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "256"))
+
+
+class CacheEntry:
+    __slots__ = ("data", "expires", "etag", "last_modified")
+
+    def __init__(self, data, expires, etag=None, last_modified=None):
+        self.data = data
+        self.expires = expires
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def is_fresh(self):
+        return time.monotonic() < self.expires
+
+    def validators(self):
+        """Headers til en betinget request, hvis serveren gav os nogen"""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """TTL-cache for GET-svar med ETag/Last-Modified til revalidering"""
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.entries = {}
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(path, params=None):
+        return path, tuple(sorted(params.items())) if params else ()
+
+    def lookup(self, key):
+        """Returnér (data, validators); data er None hvis der skal spørges serveren"""
+        entry = self.entries.get(key)
+        if entry is None:
+            return None, {}
+        if entry.is_fresh():
+            self.hits += 1
+            return entry.data, {}
+        return None, entry.validators()
+
+    def store(self, key, data, ttl, headers):
+        self.misses += 1
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        # Uden TTL og uden validators er der intet at genbruge
+        if ttl <= 0 and not etag and not last_modified:
+            self.entries.pop(key, None)
+            return
+        self.entries.pop(key, None)
+        self.entries[key] = CacheEntry(data, time.monotonic() + ttl, etag, last_modified)
+        while len(self.entries) > self.max_entries:
+            self.entries.pop(next(iter(self.entries)))
+
+    def refresh(self, key, ttl):
+        """Serveren svarede 304 – forlæng den eksisterende entry"""
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        entry.expires = time.monotonic() + ttl
+        self.revalidated += 1
+        return entry.data
+
+    def clear(self):
+        self.entries.clear()
+
+    def summary(self):
+        return f"{self.hits} hits, {self.revalidated} revalidated, {self.misses} misses"
@@ -0,0 +1,136 @@
+import asyncio
+import logging
+import os
+import signal
+
+from dotenv import dotenv_values, find_dotenv
+
+logger = logging.getLogger(__name__)
+
+# Variabler fra selve miljøet vinder over .env – også når .env genindlæses
+_process_keys = frozenset()
+_dotenv_path = None
+_from_file = set()
+
+
+def _apply_dotenv(values):
+    for key, value in values.items():
+        if key in _process_keys or value is None:
+            continue
+        os.environ[key] = value
+        _from_file.add(key)
+
+
+def load_env():
+    """Indlæs .env ved opstart (som load_dotenv) og husk hvad der kom derfra"""
+    global _process_keys, _dotenv_path
+    _process_keys = frozenset(os.environ)
+    # usecwd: an installed package must still find the .env next to the bot
+    _dotenv_path = find_dotenv(usecwd=True) or None
+    if _dotenv_path:
+        _apply_dotenv(dotenv_values(_dotenv_path))
+
+
+def reload_env():
+    """Læs .env igen og returnér navnene på de variabler der ændrede sig.
+
+    En variabel der er fjernet fra .env, falder tilbage til sin standard.
+    """
+    global _dotenv_path
+    before = dict(os.environ)
+    _dotenv_path = find_dotenv(usecwd=True) or _dotenv_path
+    values = dotenv_values(_dotenv_path) if _dotenv_path and os.path.exists(_dotenv_path) else {}
+    for key in _from_file - values.keys():
+        os.environ.pop(key, None)
+        _from_file.discard(key)
+    _apply_dotenv(values)
+    return {key for key in before.keys() | os.environ.keys() if before.get(key) != os.environ.get(key)}
+
+
+def dotenv_path():
+    return _dotenv_path
+
+
+def _stamp(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class Reloader:
+    """Genindlæsning af konfigurationen i den kørende proces.
+
+    `apply(changed)` får navnene på de ændrede miljøvariabler. Den læser og
+    validerer alt først og anvender det derefter uden at awaite, så en
+    scanning aldrig ser en halvt anvendt konfiguration; en fejl afviser hele
+    genindlæsningen, og botten kører videre med den gamle. Den returnerer
+    en kort beskrivelse af hvad der skete.
+
+    `files()` giver de filer `watch` holder øje med. `wait` er en sleep der
+    vågner med det samme, når konfigurationen er genindlæst.
+    """
+
+    def __init__(self, apply, files):
+        self.apply = apply
+        self.files = files
+        self.reloads = 0
+        self._stamps = {}
+        self._reloaded = None
+
+    def reload(self, source):
+        """Genindlæs nu; returnerer beskeden til den der bad om det"""
+        environ, from_file = dict(os.environ), set(_from_file)
+        try:
+            message = self.apply(reload_env())
+        except Exception as e:
+            # Miljøet skal passe med den konfiguration der stadig kører
+            for key in os.environ.keys() - environ.keys():
+                del os.environ[key]
+            os.environ.update(environ)
+            _from_file.clear()
+            _from_file.update(from_file)
+            message = f"❌ Konfigurationen blev ikke genindlæst ({source}): {e}"
+            logger.error(message)
+            return message
+        finally:
+            self._stamps = {path: _stamp(path) for path in self.files()}
+        self.reloads += 1
+        message = f"🔁 Konfiguration genindlæst ({source}): {message}"
+        logger.info(message)
+        if self._reloaded is not None:
+            self._reloaded.set()
+        self._reloaded = None
+        return message
+
+    async def wait(self, timeout):
+        """Sov i `timeout` sekunder; returnerer True hvis der blev genindlæst imens"""
+        if self._reloaded is None:
+            self._reloaded = asyncio.Event()
+        try:
+            await asyncio.wait_for(self._reloaded.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    def install_signal_handler(self):
+        """SIGHUP genindlæser; returnerer False hvor det ikke understøttes (Windows)"""
+        if not hasattr(signal, "SIGHUP"):
+            return False
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGHUP, self.reload, "SIGHUP")
+        except (NotImplementedError, RuntimeError):
+            return False
+        return True
+
+    async def watch(self, interval):
+        """Genindlæs når en af filerne ændres; tjekker mtime hvert `interval` sekund"""
+        self._stamps = {path: _stamp(path) for path in self.files()}
+        while True:
+            await asyncio.sleep(interval)
+            stamps = {path: _stamp(path) for path in self.files()}
+            if stamps != self._stamps:
+                changed = ", ".join(os.path.basename(path) for path in stamps
+                                    if stamps[path] != self._stamps.get(path))
+                self.reload(f"ændret fil: {changed}")
@@ -0,0 +1,151 @@
+import asyncio
+import hmac
+import os
+
+from aiohttp import web
+
+from .events import sse_frame
+
+# Dashboard settings
+DASHBOARD_PATH = os.getenv("DASHBOARD_PATH", "/dashboard")
+DASHBOARD_TOKEN = os.getenv("DASHBOARD_TOKEN")  # required ?token=...; the dashboard is only mounted when set
+DASHBOARD_KEEPALIVE = float(os.getenv("DASHBOARD_KEEPALIVE", "15"))  # seconds between SSE comments
+
+PAGE = """<!doctype html>
+<html lang="da">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>Holdsport Bot</title>
+<style>
+  body { font: 14px/1.4 system-ui, sans-serif; margin: 1.5rem; color: #222; }
+  h1 { font-size: 1.3rem; } h2 { font-size: 1.05rem; margin-top: 1.5rem; }
+  #conn { font-size: .85rem; color: #888; }
+  dl { display: grid; grid-template-columns: max-content auto; gap: .2rem 1rem; }
+  dt { color: #666; } dd { margin: 0; }
+  table { border-collapse: collapse; width: 100%; }
+  td, th { text-align: left; padding: .25rem .5rem; border-bottom: 1px solid #eee; }
+  #events td:first-child { white-space: nowrap; color: #888; }
+  .error td { color: #b00020; } .signup td { color: #1b7f3b; }
+</style>
+</head>
+<body>
+<h1>🤖 Holdsport Bot <span id="conn">forbinder…</span></h1>
+<dl id="status"></dl>
+<h2>Kommende matchede aktiviteter</h2>
+<table><thead><tr><th>Konto</th><th>Aktivitet</th><th>Hold</th><th>Start</th><th>Åbner</th><th></th></tr></thead>
+<tbody id="upcoming"></tbody></table>
+<h2>Hændelser</h2>
+<table><tbody id="events"></tbody></table>
+<script>
+const MAX_ROWS = 200;
+const $ = (id) => document.getElementById(id);
+const time = (ts) => new Date(ts * 1000).toLocaleTimeString();
+function cell(row, text) { const td = row.insertCell(); td.textContent = text ?? ""; }
+
+function describe(kind, e) {
+  switch (kind) {
+    case "scan": return `Scanning: ${e.matches} match(es), ${e.errors} fejl, ${e.duration.toFixed(2)}s`;
+    case "match": return `${e.account}: ${e.name} (${e.team}) ${e.starttime ?? ""}`;
+    case "armed": return `${e.account}: tilmelding til ${e.name} klargjort til ${e.opens_at}`;
+    case "signup": return `${e.account}: ${e.name} – ${e.ok ? "tilmeldt" : "fejlede"} ${e.status_code ?? e.error ?? ""}`;
+    case "notification": return `${e.channel}: ${e.ok ? "sendt" : "fejlede – " + e.error}`;
+    case "error": return e.message;
+    case "leader": return `${e.instance} er nu ${e.leader ? "leder" : "standby"}`;
+    case "reload": return `Konfiguration genindlæst: ${e.updated.join(", ") || "ingen ændringer"}`
+      + (e.restart.length ? ` – kræver genstart: ${e.restart.join(", ")}` : "");
+    default: return JSON.stringify(e);
+  }
+}
+
+function showEvent(kind, e) {
+  const row = $("events").insertRow(0);
+  row.className = kind;
+  cell(row, time(e.ts)); cell(row, kind); cell(row, describe(kind, e));
+  while ($("events").rows.length > MAX_ROWS) $("events").deleteRow(-1);
+}
+
+function showState(s) {
+  $("status").replaceChildren();
+  for (const [label, value] of Object.entries(s.status)) {
+    const dt = document.createElement("dt"); dt.textContent = label;
+    const dd = document.createElement("dd"); dd.textContent = value ?? "–";
+    $("status").append(dt, dd);
+  }
+  $("upcoming").replaceChildren();
+  for (const a of s.upcoming) {
+    const row = $("upcoming").insertRow();
+    [a.account, a.name, a.team, a.starttime, a.opens_at, a.armed ? "🎯" : ""].forEach((v) => cell(row, v));
+  }
+}
+
+const source = new EventSource("__EVENTS__" + location.search);
+source.onopen = () => { $("conn").textContent = "live"; };
+source.onerror = () => { $("conn").textContent = "genforbinder…"; };
+source.addEventListener("state", (m) => showState(JSON.parse(m.data)));
+for (const kind of ["scan", "match", "armed", "signup", "notification", "error", "leader", "reload"]) {
+  source.addEventListener(kind, (m) => showEvent(kind, JSON.parse(m.data)));
+}
+</script>
+</body>
+</html>
+"""
+
+
+def mount(web_app, events, snapshot, path=DASHBOARD_PATH, token=DASHBOARD_TOKEN):
+    """Tilføj dashboardet på `path` og live-hændelser på `path`/events.
+
+    `snapshot` skal være billig og må ikke kalde Holdsport – den kaldes
+    én gang pr. ny forbindelse og giver {"status": {...}, "upcoming": [...]}.
+    Senere tilstande sendes som "state"-hændelser med EventLog.broadcast.
+    Uden `token` afvises alle anmodninger.
+    """
+    path = path.rstrip("/")
+    page = PAGE.replace("__EVENTS__", path + "/events")
+
+    def authorized(request):
+        return bool(token) and hmac.compare_digest(request.query.get("token", ""), token)
+
+    async def handle_page(request):
+        if not authorized(request):
+            return web.Response(status=403)
+        return web.Response(text=page, content_type="text/html", charset="utf-8")
+
+    async def handle_events(request):
+        if not authorized(request):
+            return web.Response(status=403)
+        try:
+            last_id = int(request.headers.get("Last-Event-ID", ""))
+        except ValueError:
+            last_id = None
+
+        response = web.StreamResponse(headers={
+            "Content-Type": "text/event-stream",
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        })
+        await response.prepare(request)
+        with events.subscribe(last_id) as (backlog, queue):
+            try:
+                for frame in backlog:
+                    await response.write(frame)
+                await response.write(sse_frame(None, "state", snapshot()))
+                while True:
+                    try:
+                        frame = await asyncio.wait_for(queue.get(), DASHBOARD_KEEPALIVE)
+                    except asyncio.TimeoutError:
+                        frame = b": keepalive\n\n"
+                    if frame is None:
+                        break
+                    await response.write(frame)
+            except ConnectionResetError:
+                pass
+        return response
+
+    async def close_streams(_):
+        events.close()
+
+    web_app.router.add_get(path, handle_page)
+    web_app.router.add_get(path + "/", handle_page)
+    web_app.router.add_get(path + "/events", handle_events)
+    web_app.on_shutdown.append(close_streams)
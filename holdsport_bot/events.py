@@ -0,0 +1,91 @@
+import asyncio
+import collections
+import contextlib
+import itertools
+import json
+import os
+import time
+
+# Event settings
+EVENTS_BUFFER = int(os.getenv("EVENTS_BUFFER", "500"))  # events kept for replay
+EVENTS_SUBSCRIBER_QUEUE = int(os.getenv("EVENTS_SUBSCRIBER_QUEUE", "100"))  # per viewer before it is dropped
+
+
+def sse_frame(event_id, kind, data):
+    """Ét Server-Sent Events-frame som bytes"""
+    payload = json.dumps(data, ensure_ascii=False, default=str)
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {kind}\ndata: {payload}\n\n".encode()
+
+
+class EventLog:
+    """Ringbuffer med de seneste hændelser og de live-abonnenter der følger med.
+
+    Hver hændelse serialiseres én gang ved `publish`; abonnenter får den
+    færdige frame. En abonnent der ikke kan følge med, lukkes i stedet for
+    at bufferen vokser – klienten genopretter forbindelsen med
+    Last-Event-ID og får det manglende fra ringbufferen.
+    """
+
+    def __init__(self, size=EVENTS_BUFFER):
+        self._buffer = collections.deque(maxlen=size)  # (id, frame)
+        self._ids = itertools.count(1)
+        self._subscribers = set()
+        self.published = 0
+        self.dropped_subscribers = 0
+
+    def publish(self, kind, **data):
+        data["ts"] = time.time()
+        event_id = next(self._ids)
+        frame = sse_frame(event_id, kind, data)
+        self._buffer.append((event_id, frame))
+        self.published += 1
+        self._send(frame)
+
+    def broadcast(self, kind, data):
+        """Send til nuværende abonnenter uden at gemme i bufferen, fx en ny tilstand"""
+        if self._subscribers:
+            self._send(sse_frame(None, kind, data))
+
+    def _send(self, frame):
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(frame)
+            except asyncio.QueueFull:
+                self._disconnect(queue)
+                self.dropped_subscribers += 1
+
+    def backlog(self, last_id=None):
+        """Frames efter `last_id` (alle i bufferen hvis None)"""
+        return [frame for event_id, frame in self._buffer if last_id is None or event_id > last_id]
+
+    @contextlib.contextmanager
+    def subscribe(self, last_id=None):
+        """Giv (backlog, queue); queue leverer frames og None når forbindelsen skal lukkes"""
+        queue = asyncio.Queue(maxsize=EVENTS_SUBSCRIBER_QUEUE)
+        self._subscribers.add(queue)
+        try:
+            yield self.backlog(last_id), queue
+        finally:
+            self._subscribers.discard(queue)
+
+    @property
+    def subscribers(self):
+        return len(self._subscribers)
+
+    def close(self):
+        """Afslut alle abonnementer, fx når HTTP-serveren lukker"""
+        for queue in list(self._subscribers):
+            self._disconnect(queue)
+
+    def _disconnect(self, queue):
+        self._subscribers.discard(queue)
+        while True:
+            try:
+                queue.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+        queue.put_nowait(None)
+
+
+EVENTS = EventLog()
@@ -0,0 +1,244 @@
+import asyncio
+import json
+import os
+import time
+from datetime import datetime
+
+import aiohttp
+
+from .activity import read_activities
+from .cache import ACTIVITIES_CACHE_TTL, TEAMS_CACHE_TTL, ResponseCache
+from .metrics import API_ERRORS, API_LATENCY, API_RETRIES
+from .resilience import (RATE_LIMITER, RETRY_ATTEMPTS, RETRY_BASE, RETRY_MAX, CircuitBreaker,
+                        backoff_delay, is_retryable, retry_after)
+
+API_BASE = os.getenv("HOLDSPORT_API_BASE", "https://api.holdsport.dk/v1")
+
+# Connection pool settings
+HTTP_POOL_LIMIT = int(os.getenv("HTTP_POOL_LIMIT", "20"))
+HTTP_POOL_LIMIT_PER_HOST = int(os.getenv("HTTP_POOL_LIMIT_PER_HOST", "10"))
+HTTP_DNS_TTL = int(os.getenv("HTTP_DNS_TTL", "300"))  # seconds
+HTTP_KEEPALIVE = float(os.getenv("HTTP_KEEPALIVE", "60"))  # seconds
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "15"))  # seconds per request
+
+DEFAULT_HEADERS = {
+    "Accept": "application/json",
+    "Content-Type": "application/json",
+    "User-Agent": "Holdsport-MVP/1.0"
+}
+
+SIGNUP_BODY = {"activities_user": {"joined_status": 1, "picked": 1}}
+
+
+
+class InvalidResponseError(aiohttp.ClientError):
+    """Holdsport svarede, men ikke med gyldig JSON (fx en HTML-side under vedligeholdelse)"""
+
+
+# Errors a caller should treat as "the API call failed"
+REQUEST_ERRORS = (aiohttp.ClientError, asyncio.TimeoutError)
+
+# Metric children per endpoint, resolved once so a request allocates nothing extra
+ENDPOINTS = ("/teams", "/teams/{id}/activities", "signup", "warm_up")
+ENDPOINT_METRICS = {endpoint: (API_LATENCY.labels(endpoint), API_ERRORS.labels(endpoint)) for endpoint in ENDPOINTS}
+
+# One breaker per read endpoint, shared by every account in the process
+BREAKERS = {endpoint: CircuitBreaker(endpoint) for endpoint in ("/teams", "/teams/{id}/activities")}
+
+
+def expect_opening(opens_at):
+    """Lad afbryderne prøve igen senest ved en kendt tilmeldingsåbning (aware datetime)"""
+    at = time.monotonic() + (opens_at - datetime.now(opens_at.tzinfo)).total_seconds()
+    for breaker in BREAKERS.values():
+        breaker.expect_opening(at)
+
+
+def create_session(limit=None, limit_per_host=None, dns_ttl=None,
+                   keepalive=None, timeout=None):
+    """Opret en ClientSession med keep-alive connector og DNS cache.
+
+    Sessionen bærer ingen credentials, så den kan deles med andre kald
+    (Discord, self-ping) uden at lække Holdsport-login.
+    """
+    connector = aiohttp.TCPConnector(
+        limit=HTTP_POOL_LIMIT if limit is None else limit,
+        limit_per_host=HTTP_POOL_LIMIT_PER_HOST if limit_per_host is None else limit_per_host,
+        use_dns_cache=True,
+        ttl_dns_cache=HTTP_DNS_TTL if dns_ttl is None else dns_ttl,
+        keepalive_timeout=HTTP_KEEPALIVE if keepalive is None else keepalive,
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        headers=DEFAULT_HEADERS,
+        timeout=aiohttp.ClientTimeout(total=HTTP_TIMEOUT if timeout is None else timeout),
+    )
+
+
+_shared_session = None
+
+
+def shared_session():
+    """Processens fælles session – alle konti og kald deler den samme pool"""
+    global _shared_session
+    if _shared_session is None or _shared_session.closed:
+        _shared_session = create_session()
+    return _shared_session
+
+
+async def close_shared_session():
+    global _shared_session
+    if _shared_session is not None and not _shared_session.closed:
+        await _shared_session.close()
+    _shared_session = None
+
+
+def activity_key(activity):
+    key = activity.get("id") or activity.get("action_path")
+    return str(key) if key is not None else None
+
+
+def normalize_action_path(action_path):
+    """Holdsport returnerer stier med /v1-præfiks, som API_BASE allerede har"""
+    if action_path.startswith("/v1"):
+        return action_path[3:]
+    return action_path
+
+
+class HoldsportClient:
+    """Asynkron Holdsport API-klient på en langlivet, delt connection pool"""
+
+    def __init__(self, username, password, base_url=API_BASE, session=None, cache=None):
+        self.base_url = base_url
+        self.auth = aiohttp.BasicAuth(username or "", password or "")
+        self._session = session
+        self.cache = ResponseCache() if cache is None else cache
+        self.request_count = 0
+
+    @property
+    def session(self):
+        # Sessionen skal oprettes inde i det kørende event loop
+        if self._session is not None and not self._session.closed:
+            return self._session
+        return shared_session()
+
+    async def close(self):
+        # En medgivet session ejes af den der gav den
+        if self._session is None:
+            await close_shared_session()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def get_json(self, path, params=None, ttl=0, endpoint=None, reader=None):
+        """GET med cache, rate limit, retry med backoff og circuit breaker.
+
+        `reader` kan erstatte `response.json()`, fx med en streamende parser.
+        """
+        key = ResponseCache.key(path, params)
+        cached, headers = self.cache.lookup(key)
+        if cached is not None:
+            return cached
+
+        endpoint = endpoint or path
+        breaker = BREAKERS[endpoint]
+        latency, errors = ENDPOINT_METRICS[endpoint]
+        attempt = 0
+        while True:
+            attempt += 1
+            breaker.check()
+            await RATE_LIMITER.acquire()
+            try:
+                data = await self._get(path, params, headers, key, ttl, latency, reader)
+            except REQUEST_ERRORS as e:
+                errors.inc()
+                if not is_retryable(e):
+                    breaker.success()  # Holdsport svarede – fejlen er vores
+                    raise
+                if attempt >= RETRY_ATTEMPTS or breaker.is_open:
+                    breaker.failure()
+                    raise
+                API_RETRIES.labels(endpoint).inc()
+                await asyncio.sleep(min(RETRY_MAX, retry_after(e) or backoff_delay(attempt, RETRY_BASE, RETRY_MAX)))
+                continue
+            except BaseException:
+                breaker.abandon()
+                raise
+            breaker.success()
+            return data
+
+    async def _get(self, path, params, headers, key, ttl, latency, reader=None):
+        self.request_count += 1
+        start = time.monotonic()
+        try:
+            async with self.session.get(f"{self.base_url}{path}", params=params, headers=headers, auth=self.auth) as response:
+                if response.status == 304 and headers:
+                    cached = self.cache.refresh(key, ttl)
+                    if cached is not None:
+                        return cached
+                response.raise_for_status()
+                try:
+                    data = await (reader(response) if reader else response.json(content_type=None))
+                except ValueError as e:
+                    raise InvalidResponseError(f"ugyldigt svar fra {path}: {e}") from e
+        finally:
+            latency.observe(time.monotonic() - start)
+        self.cache.store(key, data, ttl, response.headers)
+        return data
+
+    async def get_teams(self):
+        return await self.get_json("/teams", ttl=TEAMS_CACHE_TTL)
+
+    async def get_activities(self, team_id, start_date, end_date):
+        params = {
+            "date": start_date.strftime("%Y-%m-%d"),
+            "end_date": end_date.strftime("%Y-%m-%d")
+        }
+        return await self.get_json(
+            f"/teams/{team_id}/activities", params=params, ttl=ACTIVITIES_CACHE_TTL, endpoint="/teams/{id}/activities",
+            reader=read_activities,
+        )
+
+    async def warm_up(self):
+        """Slå DNS op og åbn TLS-forbindelsen, så den ligger klar i poolen"""
+        latency, errors = ENDPOINT_METRICS["warm_up"]
+        start = time.monotonic()
+        try:
+            async with self.session.head(self.base_url, auth=self.auth) as response:
+                await response.read()
+                return response.status
+        except REQUEST_ERRORS:
+            errors.inc()
+            raise
+        finally:
+            latency.observe(time.monotonic() - start)
+
+    def prepare_signup(self, activity):
+        """Byg metode, URL og body til tilmeldingen på forhånd"""
+        action_path = normalize_action_path(activity.action_path)
+        return activity.action_method, f"{self.base_url}{action_path}", json.dumps(SIGNUP_BODY).encode()
+
+    async def send_prepared(self, prepared):
+        method, url, body = prepared
+        latency, errors = ENDPOINT_METRICS["signup"]
+        # Tilmeldingen er tidskritisk og ikke idempotent: ingen kø og ingen retry
+        RATE_LIMITER.spend()
+        self.request_count += 1
+        start = time.monotonic()
+        try:
+            async with self.session.request(method, url, data=body, auth=self.auth) as response:
+                await response.read()
+                if response.status >= 400:
+                    errors.inc()
+                return response.status
+        except REQUEST_ERRORS:
+            errors.inc()
+            raise
+        finally:
+            latency.observe(time.monotonic() - start)
+
+    async def signup(self, activity):
+        """Send tilmeldingen og returnér HTTP-statuskoden"""
+        return await self.send_prepared(self.prepare_signup(activity))
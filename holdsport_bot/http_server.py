@@ -0,0 +1,49 @@
+import asyncio
+import logging
+
+from aiohttp import web
+
+from . import metrics
+from .holdsport_client import shared_session
+
+logger = logging.getLogger(__name__)
+
+
+async def handle_health_check(request):
+    return web.Response(text="Holdsport Bot is running")
+
+
+async def handle_metrics(request):
+    return web.Response(text=metrics.render(), content_type="text/plain", charset="utf-8",
+                        headers={"X-Content-Type-Options": "nosniff"})
+
+
+def create_app():
+    """aiohttp-app med /health og /metrics; andre features kan tilføje routes før start"""
+    app = web.Application()
+    app.router.add_get('/health', handle_health_check)
+    app.router.add_get('/metrics', handle_metrics)
+    return app
+
+
+async def start(app, port):
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '0.0.0.0', port)
+    await site.start()
+    logger.info(f"🌐 HTTP server started on port {port}")
+    return runner
+
+
+async def self_ping(port, interval, status):
+    """Hold hosting-platformen vågen ved at kalde vores egen /health"""
+    while status["is_running"]:
+        try:
+            async with shared_session().get(f"http://localhost:{port}/health") as response:
+                if response.status == 200:
+                    logger.debug("✅ Self-ping successful")
+                else:
+                    logger.warning(f"⚠️ Self-ping failed with status {response.status}")
+        except Exception as e:
+            logger.warning(f"⚠️ Self-ping error: {e}")
+        await asyncio.sleep(interval)
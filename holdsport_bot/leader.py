@@ -0,0 +1,191 @@
+import asyncio
+import importlib
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+
+from .metrics import LEADER, LEADER_CHANGES
+
+# Coordination settings: instances sharing a lease elect one leader that polls and signs up.
+LEADER_LOCK = os.getenv("LEADER_LOCK")  # SQLite file shared by the instances; empty = no coordination
+LEADER_BACKEND = os.getenv("LEADER_BACKEND")  # "module:factory" returning a custom lease backend
+LEADER_LEASE_TTL = float(os.getenv("LEADER_LEASE_TTL", "15"))  # seconds a lease is valid without renewal
+LEADER_RENEW_INTERVAL = float(os.getenv("LEADER_RENEW_INTERVAL", "5"))  # seconds between renew/acquire attempts
+INSTANCE_ID = os.getenv("INSTANCE_ID") or f"{socket.gethostname()}:{os.getpid()}"
+LEASE_NAME = "holdsport-bot"
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS leases (
+    name TEXT PRIMARY KEY,
+    holder TEXT NOT NULL,
+    token INTEGER NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+
+class SqliteLeaseBackend:
+    """Lease i en SQLite-fil, som instanserne på samme maskine (eller et delt
+    drev med rigtig fil-låsning) deler.
+
+    En backend har tre blokerende metoder, som Coordinator kalder i en tråd:
+    `acquire(holder, ttl)` returnerer et fencing-token eller None,
+    `renew(holder, token, ttl)` returnerer True hvis leasen stadig er vores,
+    og `release(holder, token)` giver den fra sig. Tokenet stiger hver gang
+    leasen skifter hænder, så en gammel leder aldrig kan forveksles med en ny.
+    """
+
+    def __init__(self, path, name=LEASE_NAME):
+        self.name = name
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5, isolation_level=None, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+
+    def acquire(self, holder, ttl):
+        now = time.time()
+        with self._lock:
+            conn = self._conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute("SELECT holder, token, expires_at FROM leases WHERE name = ?", (self.name,)).fetchone()
+                if row is None:
+                    token = 1
+                    conn.execute("INSERT INTO leases (name, holder, token, expires_at) VALUES (?, ?, ?, ?)",
+                                 (self.name, holder, token, now + ttl))
+                elif row[2] <= now:
+                    token = row[1] + 1
+                    conn.execute("UPDATE leases SET holder = ?, token = ?, expires_at = ? WHERE name = ?",
+                                 (holder, token, now + ttl, self.name))
+                else:
+                    token = None
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return token
+
+    def renew(self, holder, token, ttl):
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE leases SET expires_at = ? WHERE name = ? AND holder = ? AND token = ? AND expires_at > ?",
+                (now + ttl, self.name, holder, token, now),
+            )
+        return cursor.rowcount == 1
+
+    def release(self, holder, token):
+        with self._lock:
+            self._conn.execute("UPDATE leases SET expires_at = 0 WHERE name = ? AND holder = ? AND token = ?",
+                               (self.name, holder, token))
+
+    def close(self):
+        self._conn.close()
+
+
+def load_backend():
+    """Backend ud fra LEADER_BACKEND eller LEADER_LOCK; None når der ikke koordineres"""
+    if LEADER_BACKEND:
+        module, _, factory = LEADER_BACKEND.partition(":")
+        return getattr(importlib.import_module(module), factory or "create_backend")()
+    if LEADER_LOCK:
+        return SqliteLeaseBackend(LEADER_LOCK)
+    return None
+
+
+class Coordinator:
+    """Leader election over en lease-backend.
+
+    Lederen fornyer leasen hvert `interval` sekund. Den regner sig kun
+    for leder indtil `ttl` efter det seneste vellykkede kald *begyndte* –
+    før en standby kan overtage en udløbet lease. En standby forsøger at
+    tage leasen med samme interval og overtager senest `ttl + interval`
+    sekunder efter at lederen holdt op med at forny.
+
+    `on_change(is_leader)` kaldes ved hvert rolleskift.
+    """
+
+    def __init__(self, backend, instance_id=INSTANCE_ID, ttl=LEADER_LEASE_TTL,
+                 interval=LEADER_RENEW_INTERVAL, on_change=None):
+        if interval >= ttl:
+            raise ValueError("LEADER_RENEW_INTERVAL skal være mindre end LEADER_LEASE_TTL")
+        self.backend = backend
+        self.instance_id = instance_id
+        self.ttl = ttl
+        self.interval = interval
+        self.on_change = on_change
+        self.token = None
+        self._valid_until = 0.0
+        self._elected = None
+
+    @property
+    def is_leader(self):
+        """Fencing-check uden I/O – må kaldes lige før hver tilmelding"""
+        return self.token is not None and time.monotonic() < self._valid_until
+
+    @property
+    def role(self):
+        return f"leader (token {self.token})" if self.is_leader else "standby"
+
+    async def wait_until_leader(self):
+        if self._elected is None:
+            self._elected = asyncio.Event()
+        while not self.is_leader:
+            if self._elected.is_set():
+                # Valgt, men leasen er udløbet lokalt – næste fornyelse afgør rollen
+                await asyncio.sleep(self.interval)
+            else:
+                await self._elected.wait()
+
+    async def run(self):
+        """Forny eller forsøg at tage leasen, indtil tasken annulleres"""
+        try:
+            while True:
+                await self._tick()
+                await asyncio.sleep(self.interval)
+        finally:
+            if self.token is not None:
+                token, self.token = self.token, None
+                LEADER.set(0)
+                try:
+                    await asyncio.to_thread(self.backend.release, self.instance_id, token)
+                except Exception as e:
+                    logger.warning("⚠️ Kunne ikke frigive leasen: %s", e)
+
+    async def _tick(self):
+        started = time.monotonic()
+        try:
+            if self.token is None:
+                token = await asyncio.to_thread(self.backend.acquire, self.instance_id, self.ttl)
+                if token is not None:
+                    self._valid_until = started + self.ttl
+                    self._set_role(token)
+            elif await asyncio.to_thread(self.backend.renew, self.instance_id, self.token, self.ttl):
+                self._valid_until = started + self.ttl
+            else:
+                logger.warning("⚠️ Leasen er overtaget af en anden instans")
+                self._set_role(None)
+        except Exception as e:
+            logger.warning("⚠️ Lease-backend fejlede: %s", e)
+        if self.token is not None and not self.is_leader:
+            logger.warning("⚠️ Leasen udløb før den kunne fornyes")
+            self._set_role(None)
+
+    def _set_role(self, token):
+        was_leader = self.token is not None
+        self.token = token
+        if self._elected is None:
+            self._elected = asyncio.Event()
+        if token is not None:
+            self._elected.set()
+        else:
+            self._elected.clear()
+        LEADER.set(1 if token is not None else 0)
+        if was_leader != (token is not None):
+            LEADER_CHANGES.inc()
+            if self.on_change:
+                self.on_change(token is not None)
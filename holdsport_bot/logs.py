@@ -0,0 +1,123 @@
+import atexit
+import gzip
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import shutil
+
+# Logging settings
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").strip().upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").strip().lower()  # text | json
+LOG_FILE = os.getenv("LOG_FILE", "holdsport.log")  # empty = console only
+LOG_CONSOLE = os.getenv("LOG_CONSOLE", "true").strip().lower() in ("1", "true", "yes")
+LOG_ROTATE = os.getenv("LOG_ROTATE", "size").strip().lower()  # size | time
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(5 * 1024 * 1024)))
+LOG_ROTATE_WHEN = os.getenv("LOG_ROTATE_WHEN", "midnight")  # see TimedRotatingFileHandler
+LOG_BACKUPS = int(os.getenv("LOG_BACKUPS", "5"))
+LOG_COMPRESS = os.getenv("LOG_COMPRESS", "true").strip().lower() in ("1", "true", "yes")
+
+TEXT_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+
+# LogRecord attributes that are not user-supplied `extra` fields
+_RECORD_FIELDS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "taskName"}
+
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Én kompakt JSON-linje pr. record; `extra`-felter kommer med"""
+
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_FIELDS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record):
+        # Flet kun msg og args i den kaldende tråd; formatering og
+        # traceback-tekst klares af skrivertråden
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def _gzip_namer(name):
+    return name + ".gz"
+
+
+def _gzip_rotator(source, dest):
+    with open(source, "rb") as src, gzip.open(dest, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(source)
+
+
+def _file_handler(path):
+    if LOG_ROTATE == "time":
+        handler = logging.handlers.TimedRotatingFileHandler(
+            path, when=LOG_ROTATE_WHEN, backupCount=LOG_BACKUPS, encoding="utf-8"
+        )
+    else:
+        handler = logging.handlers.RotatingFileHandler(
+            path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS, encoding="utf-8"
+        )
+    if LOG_COMPRESS:
+        handler.namer = _gzip_namer
+        handler.rotator = _gzip_rotator
+    return handler
+
+
+def setup_logging(level=None, fmt=None, path=None):
+    """Send al logging gennem en kø til en baggrundstråd.
+
+    Event loopet lægger kun records i køen; konsol, fil, rotation og
+    komprimering håndteres af en QueueListener i sin egen tråd.
+    """
+    global _listener
+    if _listener is not None:
+        return
+    level = level or LOG_LEVEL
+    fmt = fmt or LOG_FORMAT
+    path = LOG_FILE if path is None else path
+
+    formatter = JsonFormatter() if fmt == "json" else logging.Formatter(TEXT_FORMAT)
+    handlers = []
+    if LOG_CONSOLE:
+        handlers.append(logging.StreamHandler())
+    if path:
+        handlers.append(_file_handler(path))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(_QueueHandler(log_queue))
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """Skriv resten af køen og stop skrivertråden"""
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = None
@@ -0,0 +1,181 @@
+import asyncio
+import os
+import time
+from bisect import bisect_left
+
+# Event loop lag sampling interval in seconds
+LOOP_LAG_INTERVAL = float(os.getenv("LOOP_LAG_INTERVAL", "1"))
+
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SCAN_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+SIGNUP_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 5, 10, 30, 60, 300, 900)
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1)
+
+REGISTRY = []
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{value}"' for name, value in pairs) + "}"
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+
+class _HistogramChild:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        REGISTRY.append(self)
+
+    def labels(self, *values):
+        child = self._children.get(values)
+        if child is None:
+            child = self._children[values] = self._new_child()
+        return child
+
+    def collect(self):
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.kind}"
+        for values, child in self._children.items():
+            yield from self._samples(values, child)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount=1):
+        self.labels().inc(amount)
+
+    def _samples(self, values, child):
+        yield f"{self.name}{_format_labels(self.labelnames, values)} {child.value}"
+
+
+class Histogram(_Metric):
+    """Histogram med faste buckets; observe() tæller blot op i en liste"""
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value):
+        self.labels().observe(value)
+
+    def _samples(self, values, child):
+        cumulative = 0
+        for bound, count in zip(self.buckets + ("+Inf",), child.counts):
+            cumulative += count
+            labels = _format_labels(self.labelnames, values, ("le", bound))
+            yield f"{self.name}_bucket{labels} {cumulative}"
+        labels = _format_labels(self.labelnames, values)
+        yield f"{self.name}_sum{labels} {child.sum}"
+        yield f"{self.name}_count{labels} {child.count}"
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def set(self, value):
+        self.labels().value = float(value)
+
+    def _samples(self, values, child):
+        yield f"{self.name}{_format_labels(self.labelnames, values)} {child.value}"
+
+
+def render():
+    """Alle metrics i Prometheus' tekstformat"""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.collect())
+    return "\n".join(lines) + "\n"
+
+
+API_LATENCY = Histogram(
+    "holdsport_api_latency_seconds", "Latency of Holdsport API requests", ("endpoint",)
+)
+API_ERRORS = Counter(
+    "holdsport_api_errors_total", "Failed Holdsport API requests", ("endpoint",)
+)
+API_RETRIES = Counter(
+    "holdsport_api_retries_total", "Retried Holdsport API requests", ("endpoint",)
+)
+CIRCUIT_OPENED = Counter(
+    "holdsport_circuit_opened_total", "Times a circuit breaker opened", ("endpoint",)
+)
+RATE_LIMIT_WAIT = Counter(
+    "holdsport_rate_limit_wait_seconds_total", "Time spent waiting for the client-side rate limiter"
+)
+SCAN_DURATION = Histogram(
+    "holdsport_scan_duration_seconds", "Duration of a full scan cycle", buckets=SCAN_BUCKETS
+)
+TIME_TO_SIGNUP = Histogram(
+    "holdsport_time_to_signup_seconds", "Time from registration open to successful signup", buckets=SIGNUP_BUCKETS
+)
+NOTIFICATION_FAILURES = Counter(
+    "holdsport_notification_failures_total", "Failed notification sends", ("channel",)
+)
+LEADER = Gauge(
+    "holdsport_leader", "1 while this instance holds the leader lease"
+)
+LEADER_CHANGES = Counter(
+    "holdsport_leader_changes_total", "Times this instance gained or lost leadership"
+)
+LOOP_LAG = Histogram(
+    "holdsport_event_loop_lag_seconds", "How late the event loop woke up a sleeping task", buckets=LAG_BUCKETS
+)
+LOOP_LAG_TOTAL = Counter(
+    "holdsport_event_loop_lag_seconds_total", "Accumulated event loop lag"
+)
+
+
+async def monitor_event_loop(interval=LOOP_LAG_INTERVAL):
+    """Mål hvor meget for sent event loopet vækker en sovende task"""
+    child = LOOP_LAG.labels()
+    total = LOOP_LAG_TOTAL.labels()
+    while True:
+        start = time.monotonic()
+        await asyncio.sleep(interval)
+        lag = max(0.0, time.monotonic() - start - interval)
+        child.observe(lag)
+        total.inc(lag)
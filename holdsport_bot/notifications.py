@@ -0,0 +1,211 @@
+import asyncio
+import collections
+import logging
+import os
+import time
+
+from .events import EVENTS
+from .holdsport_client import shared_session
+from .metrics import NOTIFICATION_FAILURES
+
+# Notification settings
+NOTIFY_COALESCE_WINDOW = float(os.getenv("NOTIFY_COALESCE_WINDOW", "2"))  # seconds
+NOTIFY_QUEUE_SIZE = int(os.getenv("NOTIFY_QUEUE_SIZE", "1000"))
+NOTIFY_RETRY_LIMIT = int(os.getenv("NOTIFY_RETRY_LIMIT", "50"))  # messages waiting for retry
+NOTIFY_MAX_ATTEMPTS = int(os.getenv("NOTIFY_MAX_ATTEMPTS", "5"))
+NOTIFY_RETRY_BASE = float(os.getenv("NOTIFY_RETRY_BASE", "5"))  # seconds, doubled per attempt
+
+logger = logging.getLogger(__name__)
+
+
+class Channel:
+    """En notifikationskanal. Underklasser implementerer `send`.
+
+    `default_target` bruges når en besked ikke har et mål for kanalen.
+    """
+
+    name = None
+    max_length = 4000
+
+    def __init__(self, default_target=None):
+        self.default_target = default_target
+
+    async def send(self, target, text):
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+
+class TelegramChannel(Channel):
+    name = "telegram"
+    max_length = 4096
+
+    def __init__(self, token, default_target=None):
+        super().__init__(default_target)
+        self.token = token
+        self.bot = None
+
+    async def send(self, target, text):
+        # python-telegram-bot er tung at importere, så det sker først ved
+        # første besked – i notifikations-workeren, ikke under opstart
+        if self.bot is None:
+            import telegram
+            self.bot = telegram.Bot(token=self.token)
+        # initialize() er en no-op når botten allerede er klar
+        await self.bot.initialize()
+        await self.bot.send_message(chat_id=target, text=text)
+
+    async def close(self):
+        if self.bot is not None:
+            await self.bot.shutdown()
+
+
+class DiscordChannel(Channel):
+    name = "discord"
+    max_length = 2000
+
+    async def send(self, target, text):
+        data = {"content": text, "username": "Holdsport Bot 🎾"}
+        async with shared_session().post(target, json=data) as response:
+            if response.status != 204:
+                raise RuntimeError(f"Discord webhook error: {response.status}")
+
+
+def _chunks(text, limit):
+    while len(text) > limit:
+        cut = text.rfind("\n", 0, limit)
+        cut = cut if cut > 0 else limit
+        yield text[:cut]
+        text = text[cut:].lstrip("\n")
+    if text:
+        yield text
+
+
+class Notifier:
+    """Kø-baseret afsendelse af notifikationer.
+
+    `notify` lægger kun beskeden i køen og returnerer med det samme. En
+    baggrundsworker samler beskeder til samme kanal og mål inden for
+    NOTIFY_COALESCE_WINDOW til én besked og sender dem. Fejlede
+    afsendelser lægges i en begrænset retry-kø med eksponentiel backoff.
+    """
+
+    def __init__(self):
+        self.channels = {}
+        self.sent = 0
+        self.failed = 0
+        self.dropped = 0
+        self._queue = None
+        self._retries = collections.deque(maxlen=NOTIFY_RETRY_LIMIT)
+        self._worker = None
+
+    def register(self, channel):
+        self.channels[channel.name] = channel
+
+    def notify(self, text, targets=None):
+        """Læg en besked i kø til alle kanaler; `targets` kan overstyre mål pr. kanal"""
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=NOTIFY_QUEUE_SIZE)
+        targets = targets or {}
+        for name, channel in self.channels.items():
+            target = targets.get(name) or channel.default_target
+            if not target:
+                continue
+            try:
+                self._queue.put_nowait((name, target, text))
+            except asyncio.QueueFull:
+                self.dropped += 1
+                logger.warning(f"⚠️ Notifikationskøen er fuld – besked til {name} droppet")
+
+    def start(self):
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=NOTIFY_QUEUE_SIZE)
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+    async def close(self, timeout=10):
+        """Send det der ligger i køen, og luk kanalerne"""
+        if self._worker is not None:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout)
+            except asyncio.TimeoutError:
+                logger.warning("⚠️ Ikke alle notifikationer nåede at blive sendt")
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+        for channel in self.channels.values():
+            try:
+                await channel.close()
+            except Exception as e:
+                logger.warning(f"⚠️ Kunne ikke lukke {channel.name}: {e}")
+
+    def summary(self):
+        return f"{self.sent} sent, {self.failed} failed, {len(self._retries)} waiting for retry"
+
+    async def _run(self):
+        while True:
+            try:
+                timeout = self._next_retry_in()
+                first = await asyncio.wait_for(self._queue.get(), timeout) if timeout is not None else await self._queue.get()
+            except asyncio.TimeoutError:
+                first = None
+
+            pending = collections.OrderedDict()
+            if first is not None:
+                deadline = time.monotonic() + NOTIFY_COALESCE_WINDOW
+                batch = [first]
+                while True:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                    except asyncio.TimeoutError:
+                        break
+                for name, target, text in batch:
+                    pending.setdefault((name, target), []).append(text)
+
+            for (name, target), texts in pending.items():
+                await self._deliver(name, target, "\n\n".join(text.strip() for text in texts), 1)
+                for _ in texts:
+                    self._queue.task_done()
+            await self._retry_due()
+
+    def _next_retry_in(self):
+        if not self._retries:
+            return None
+        return max(0.0, min(due for due, *_ in self._retries) - time.monotonic())
+
+    async def _retry_due(self):
+        now = time.monotonic()
+        due = [entry for entry in self._retries if entry[0] <= now]
+        for entry in due:
+            self._retries.remove(entry)
+            _, name, target, text, attempt = entry
+            await self._deliver(name, target, text, attempt)
+
+    async def _deliver(self, name, target, text, attempt):
+        channel = self.channels[name]
+        remaining = list(_chunks(text, channel.max_length))
+        try:
+            while remaining:
+                await channel.send(target, remaining[0])
+                remaining.pop(0)
+            self.sent += 1
+            EVENTS.publish("notification", channel=name, ok=True)
+            logger.info(f"✅ {name.capitalize()} notification sent successfully")
+        except Exception as e:
+            self.failed += 1
+            NOTIFICATION_FAILURES.labels(name).inc()
+            EVENTS.publish("notification", channel=name, ok=False, error=str(e))
+            if attempt >= NOTIFY_MAX_ATTEMPTS:
+                logger.error(f"❌ Failed to send {name} notification, giving up: {e}")
+                return
+            delay = NOTIFY_RETRY_BASE * 2 ** (attempt - 1)
+            if len(self._retries) == self._retries.maxlen:
+                self.dropped += 1
+            self._retries.append((time.monotonic() + delay, name, target, "\n".join(remaining), attempt + 1))
+            logger.warning(f"⚠️ Failed to send {name} notification (forsøg {attempt}), prøver igen om {delay:.0f}s: {e}")
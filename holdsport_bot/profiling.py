@@ -0,0 +1,259 @@
+import asyncio
+import collections
+import hmac
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+
+# Profiling settings
+PROFILE_DIR = os.getenv("PROFILE_DIR") or os.path.join(tempfile.gettempdir(), "holdsport-profiles")
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "10"))  # result files kept on disk
+PROFILE_MAX_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", "120"))
+PROFILE_SAMPLE_INTERVAL = float(os.getenv("PROFILE_SAMPLE_INTERVAL", "0.005"))  # seconds between CPU samples
+PROFILE_TRACE_FRAMES = int(os.getenv("PROFILE_TRACE_FRAMES", "10"))  # tracemalloc frames per allocation
+SLOW_CALLBACK_THRESHOLD = float(os.getenv("SLOW_CALLBACK_THRESHOLD", "0.01"))  # seconds
+DEBUG_TOKEN = os.getenv("DEBUG_TOKEN")  # HTTP routes are only mounted when set
+TOP = 15
+
+# The selector method the event loop sits in while it waits for I/O
+IDLE_FUNCTIONS = frozenset({"select"})
+
+
+class Busy(RuntimeError):
+    """Der kører allerede en måling af samme slags"""
+
+
+def _where(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _percent(part, whole):
+    return 100.0 * part / whole if whole else 0.0
+
+
+def _describe_handle(handle):
+    callback = getattr(handle, "_callback", None)
+    owner = getattr(callback, "__self__", None)
+    if isinstance(owner, asyncio.Task):
+        coro = owner.get_coro()
+        return f"Task {owner.get_name()}: {getattr(coro, '__qualname__', coro)}"
+    return getattr(callback, "__qualname__", None) or repr(callback)
+
+
+class Profiler:
+    """Målinger på den kørende proces uden genstart.
+
+    Hver måling returnerer (tekst-resumé, filnavn). Filerne ligger i
+    PROFILE_DIR, og kun de seneste PROFILE_KEEP gemmes.
+    """
+
+    def __init__(self, directory=PROFILE_DIR):
+        self.directory = directory
+        self.files = collections.OrderedDict()  # filnavn -> sti
+        self._running = set()
+        self._snapshot = None
+
+    def path(self, name):
+        """Stien til en resultatfil, eller None hvis navnet ikke er vores"""
+        return self.files.get(name)
+
+    def _save(self, kind, text):
+        os.makedirs(self.directory, exist_ok=True)
+        name = f"{kind}-{datetime.now():%Y%m%d-%H%M%S}.txt"
+        path = os.path.join(self.directory, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        self.files[name] = path
+        while len(self.files) > PROFILE_KEEP:
+            _, old = self.files.popitem(last=False)
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+        return name
+
+    def _claim(self, kind):
+        if kind in self._running:
+            raise Busy(f"{kind} kører allerede")
+        self._running.add(kind)
+
+    # --- CPU ---
+
+    async def cpu(self, seconds):
+        """Sample event loop-trådens stack i `seconds` sekunder"""
+        seconds = max(0.1, min(float(seconds), PROFILE_MAX_SECONDS))
+        self._claim("cpu")
+        try:
+            stacks = await asyncio.to_thread(self._sample, threading.get_ident(), seconds)
+        finally:
+            self._running.discard("cpu")
+
+        total = sum(stacks.values())
+        idle = sum(count for stack, count in stacks.items() if stack and stack[-1].co_name in IDLE_FUNCTIONS)
+        own = collections.Counter()
+        cumulative = collections.Counter()
+        for stack, count in stacks.items():
+            if stack:
+                own[stack[-1]] += count
+            for code in set(stack):
+                cumulative[code] += count
+
+        lines = [f"🔥 CPU-profil: {seconds:.0f}s, {total} samples, {_percent(idle, total):.0f}% idle i event loopet"]
+        lines.append("Egen tid:")
+        lines += [f"{_percent(count, total):5.1f}%  {_where(code)}"
+                  for code, count in own.most_common(TOP) if code.co_name not in IDLE_FUNCTIONS]
+        lines.append("Samlet tid:")
+        lines += [f"{_percent(count, total):5.1f}%  {_where(code)}" for code, count in cumulative.most_common(TOP)]
+        # Foldede stacks (flamegraph.pl / speedscope)
+        folded = "".join(
+            ";".join(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})" for code in stack)
+            + f" {count}\n"
+            for stack, count in stacks.most_common()
+        )
+        return "\n".join(lines), self._save("cpu", folded)
+
+    @staticmethod
+    def _sample(thread_id, seconds):
+        stacks = collections.Counter()
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            frame = sys._current_frames().get(thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(frame.f_code)
+                frame = frame.f_back
+            if stack:
+                stacks[tuple(reversed(stack))] += 1
+            time.sleep(PROFILE_SAMPLE_INTERVAL)
+        return stacks
+
+    # --- Hukommelse ---
+
+    async def memory(self, stop=False):
+        """Start tracemalloc, eller vis allokeringer siden sidste snapshot"""
+        if stop:
+            tracemalloc.stop()
+            self._snapshot = None
+            return "🧠 tracemalloc stoppet", None
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(PROFILE_TRACE_FRAMES)
+            self._snapshot = self._take()
+            return "🧠 tracemalloc startet – kald igen for at se hvad der er allokeret siden", None
+
+        self._claim("memory")
+        try:
+            snapshot = await asyncio.to_thread(self._take)
+            by_line, by_traceback = await asyncio.to_thread(
+                lambda: (snapshot.compare_to(self._snapshot, "lineno"), snapshot.compare_to(self._snapshot, "traceback"))
+            )
+        finally:
+            self._running.discard("memory")
+        self._snapshot = snapshot
+        current, peak = tracemalloc.get_traced_memory()
+        lines = [f"🧠 Sporet nu {current / 1024 / 1024:.1f} MiB, top {peak / 1024 / 1024:.1f} MiB. Ændring siden sidst:"]
+        lines += [f"{stat.size_diff / 1024:+9.1f} KiB {stat.count_diff:+7d} blokke  {stat.traceback[0]}"
+                  for stat in by_line[:TOP]]
+        detail = "\n\n".join(
+            f"{stat.size_diff / 1024:+.1f} KiB ({stat.count_diff:+d} blokke), nu {stat.size / 1024:.1f} KiB\n"
+            + "\n".join(stat.traceback.format(most_recent_first=True))
+            for stat in by_traceback[:100]
+        )
+        return "\n".join(lines), self._save("memory", detail)
+
+    @staticmethod
+    def _take():
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+
+    # --- Langsomme callbacks ---
+
+    async def slow_callbacks(self, seconds, threshold=SLOW_CALLBACK_THRESHOLD):
+        """Tag tid på hver callback i event loopet i `seconds` sekunder"""
+        seconds = max(0.1, min(float(seconds), PROFILE_MAX_SECONDS))
+        self._claim("slow")
+        handle_class = asyncio.events.Handle
+        original = handle_class._run
+        timings = {}  # beskrivelse -> [antal, samlet, max]
+        calls = 0
+
+        def timed_run(handle):
+            nonlocal calls
+            start = time.perf_counter()
+            try:
+                original(handle)
+            finally:
+                elapsed = time.perf_counter() - start
+                calls += 1
+                if elapsed >= threshold:
+                    entry = timings.setdefault(_describe_handle(handle), [0, 0.0, 0.0])
+                    entry[0] += 1
+                    entry[1] += elapsed
+                    entry[2] = max(entry[2], elapsed)
+
+        handle_class._run = timed_run
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            handle_class._run = original
+            self._running.discard("slow")
+
+        ranked = sorted(timings.items(), key=lambda item: item[1][2], reverse=True)
+        lines = [f"🐢 {sum(e[0] for e in timings.values())} af {calls} callbacks over {threshold * 1000:.0f} ms "
+                 f"på {seconds:.0f}s:"]
+        lines += [f"max {e[2] * 1000:7.1f} ms, {e[0]}×, i alt {e[1] * 1000:.0f} ms  {name}" for name, e in ranked[:TOP]]
+        detail = "\n".join(f"{e[2] * 1000:.3f}\t{e[0]}\t{e[1] * 1000:.3f}\t{name}" for name, e in ranked)
+        return "\n".join(lines), self._save("slow", "max_ms\tcount\ttotal_ms\tcallback\n" + detail)
+
+
+def mount(web_app, profiler, token=DEBUG_TOKEN, prefix="/debug"):
+    """HTTP-routes til profilering; kræver ?token=... eller Authorization: Bearer ..."""
+    from aiohttp import web
+
+    def authorized(request):
+        given = request.query.get("token") or request.headers.get("Authorization", "").removeprefix("Bearer ")
+        return bool(token) and hmac.compare_digest(given, token)
+
+    def seconds(request):
+        try:
+            return float(request.query.get("seconds", "10"))
+        except ValueError:
+            raise web.HTTPBadRequest(text="seconds skal være et tal")
+
+    async def respond(request, measure):
+        if not authorized(request):
+            return web.Response(status=403)
+        try:
+            summary, name = await measure()
+        except Busy as e:
+            return web.Response(status=409, text=str(e))
+        if name:
+            summary += f"\n\n📎 {prefix}/files/{name}"
+        return web.Response(text=summary + "\n", charset="utf-8")
+
+    async def handle_cpu(request):
+        return await respond(request, lambda: profiler.cpu(seconds(request)))
+
+    async def handle_memory(request):
+        return await respond(request, lambda: profiler.memory(stop="stop" in request.query))
+
+    async def handle_slow(request):
+        return await respond(request, lambda: profiler.slow_callbacks(seconds(request)))
+
+    async def handle_file(request):
+        if not authorized(request):
+            return web.Response(status=403)
+        path = profiler.path(request.match_info["name"])
+        if path is None or not os.path.exists(path):
+            return web.Response(status=404)
+        return web.FileResponse(path, headers={"Content-Disposition": f'attachment; filename="{os.path.basename(path)}"'})
+
+    web_app.router.add_get(f"{prefix}/cpu", handle_cpu)
+    web_app.router.add_get(f"{prefix}/memory", handle_memory)
+    web_app.router.add_get(f"{prefix}/slow", handle_slow)
+    web_app.router.add_get(f"{prefix}/files/{{name}}", handle_file)
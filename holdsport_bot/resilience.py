@@ -0,0 +1,184 @@
+import asyncio
+import logging
+import os
+import random
+import time
+
+import aiohttp
+
+from .metrics import CIRCUIT_OPENED, RATE_LIMIT_WAIT
+
+# Retry settings for idempotent requests (GET)
+RETRY_ATTEMPTS = int(os.getenv("RETRY_ATTEMPTS", "3"))  # attempts per request, including the first
+RETRY_BASE = float(os.getenv("RETRY_BASE", "0.5"))  # seconds, doubled per attempt
+RETRY_MAX = float(os.getenv("RETRY_MAX", "8"))  # cap on a single retry delay
+
+# Backoff between scan cycles that failed in a row
+ERROR_BACKOFF_BASE = float(os.getenv("ERROR_BACKOFF_BASE", "2"))
+ERROR_BACKOFF_MAX = float(os.getenv("ERROR_BACKOFF_MAX", "300"))
+
+# Circuit breaker settings
+BREAKER_THRESHOLD = int(os.getenv("BREAKER_THRESHOLD", "5"))  # failures in a row, after retries and spacing
+BREAKER_FAILURE_SPACING = float(os.getenv("BREAKER_FAILURE_SPACING", "5"))  # failures closer together count once
+BREAKER_COOLDOWN = float(os.getenv("BREAKER_COOLDOWN", "10"))  # seconds, doubled while it keeps failing
+BREAKER_MAX_COOLDOWN = float(os.getenv("BREAKER_MAX_COOLDOWN", "600"))
+BREAKER_OPENING_WINDOW = float(os.getenv("BREAKER_OPENING_WINDOW", "60"))  # seconds around a known opening
+BREAKER_OPENING_COOLDOWN = float(os.getenv("BREAKER_OPENING_COOLDOWN", "2"))  # max pause inside that window
+
+# Process-wide rate limit for Holdsport requests (0 = unlimited)
+RATE_LIMIT = float(os.getenv("RATE_LIMIT", "10"))  # requests per second
+RATE_BURST = int(os.getenv("RATE_BURST", "20"))
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(aiohttp.ClientError):
+    """Kaldet blev ikke sendt, fordi endpointet er afbrudt efter gentagne fejl"""
+
+    def __init__(self, name, retry_in):
+        super().__init__(f"{name} er midlertidigt afbrudt efter gentagne fejl (prøver igen om {retry_in:.0f}s)")
+        self.retry_in = retry_in
+
+
+def backoff_delay(attempt, base, cap):
+    """Full jitter: tilfældigt mellem 0 og base * 2^(attempt-1), højst `cap`"""
+    return random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+
+
+def is_retryable(error):
+    """Forbindelsesfejl, timeouts, 429 og 5xx er forbigående; andre 4xx er ikke"""
+    if isinstance(error, CircuitOpenError):
+        return False
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status == 429 or error.status >= 500
+    return isinstance(error, (aiohttp.ClientError, asyncio.TimeoutError))
+
+
+def retry_after(error):
+    """Serverens Retry-After i sekunder, hvis den har sendt en"""
+    headers = getattr(error, "headers", None)
+    try:
+        return float(headers["Retry-After"]) if headers and "Retry-After" in headers else None
+    except ValueError:
+        return None
+
+
+class CircuitBreaker:
+    """Lukket → åben efter BREAKER_THRESHOLD fejl i træk → halvåben efter cooldown.
+
+    Fejl tæller kun én gang pr. BREAKER_FAILURE_SPACING sekunder, så én
+    scanning hvor mange hold fejler samtidig, ikke alene kan åbne den.
+    Mens den er åben, afvises kald med CircuitOpenError uden at ramme
+    API'et. Efter cooldown slipper ét prøvekald igennem; lykkes det, lukkes
+    afbryderen, ellers åbner den igen med dobbelt cooldown.
+
+    Kendes næste tilmeldingsåbning (`expect_opening`), hviler afbryderen
+    aldrig forbi den, og inden for BREAKER_OPENING_WINDOW efter den højst
+    BREAKER_OPENING_COOLDOWN sekunder.
+    """
+
+    def __init__(self, name, threshold=None, cooldown=None, max_cooldown=None, spacing=None):
+        self.name = name
+        self.threshold = BREAKER_THRESHOLD if threshold is None else threshold
+        self.base_cooldown = BREAKER_COOLDOWN if cooldown is None else cooldown
+        self.max_cooldown = BREAKER_MAX_COOLDOWN if max_cooldown is None else max_cooldown
+        self.spacing = BREAKER_FAILURE_SPACING if spacing is None else spacing
+        self.cooldown = self.base_cooldown
+        self.failures = 0
+        self.last_failure = None
+        self.opened_at = None
+        self.probing = False
+        self.opening = None  # monotonic-tidspunkt for næste kendte tilmeldingsåbning
+
+    @property
+    def is_open(self):
+        return self.opened_at is not None
+
+    def expect_opening(self, at):
+        """Næste tilmeldingsåbning som monotonic-tidspunkt"""
+        self.opening = at
+
+    def retry_in(self):
+        if self.opened_at is None:
+            return 0.0
+        until = self.opened_at + self.cooldown
+        if self.opening is not None and self.opened_at <= self.opening + BREAKER_OPENING_WINDOW:
+            until = min(until, max(self.opening, self.opened_at + BREAKER_OPENING_COOLDOWN))
+        return max(0.0, until - time.monotonic())
+
+    def check(self):
+        """Kast CircuitOpenError hvis kaldet ikke må sendes nu"""
+        if self.opened_at is None:
+            return
+        remaining = self.retry_in()
+        if remaining > 0 or self.probing:
+            raise CircuitOpenError(self.name, remaining)
+        self.probing = True
+
+    def success(self):
+        if self.opened_at is not None:
+            logger.info(f"🔌 {self.name} svarer igen – afbryderen er lukket")
+        self.failures = 0
+        self.last_failure = None
+        self.opened_at = None
+        self.probing = False
+        self.cooldown = self.base_cooldown
+
+    def abandon(self):
+        """Et prøvekald blev afbrudt uden svar – lad det næste kald prøve"""
+        self.probing = False
+
+    def failure(self):
+        now = time.monotonic()
+        if self.probing:
+            self.failures += 1
+            self.probing = False
+            self.cooldown = min(self.max_cooldown, self.cooldown * 2)
+            self.opened_at = now
+            CIRCUIT_OPENED.labels(self.name).inc()
+            return
+        if self.last_failure is not None and now - self.last_failure < self.spacing:
+            return  # samme udfald – fx parallelle hold i samme scanning
+        self.last_failure = now
+        self.failures += 1
+        if self.opened_at is None and self.failures >= self.threshold:
+            self.opened_at = now
+            CIRCUIT_OPENED.labels(self.name).inc()
+            logger.warning(f"🔌 {self.name} fejlede {self.failures} gange i træk – pauser kald i {self.cooldown:.0f}s")
+
+
+class TokenBucket:
+    """Token bucket delt af alle konti og løkker i processen.
+
+    `acquire` reserverer en token med det samme og sover kun for
+    underskuddet, så ventende kald ikke behøver en lås og ikke bruger CPU.
+    """
+
+    def __init__(self, rate=RATE_LIMIT, burst=RATE_BURST):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+
+    def _reserve(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        return -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+    async def acquire(self):
+        if self.rate <= 0:
+            return
+        wait = self._reserve()
+        if wait > 0:
+            RATE_LIMIT_WAIT.inc(wait)
+            await asyncio.sleep(wait)
+
+    def spend(self):
+        """Brug en token uden at vente – til tidskritiske kald som tilmelding"""
+        if self.rate > 0:
+            self._reserve()
+
+
+RATE_LIMITER = TokenBucket()
@@ -0,0 +1,161 @@
+import json
+import os
+import re
+from datetime import time as dtime
+
+from .scheduler import parse_time
+
+# Rule settings: a JSON list in HOLDSPORT_RULES or a JSON file in RULES_FILE.
+# Without either, HOLDSPORT_ACTIVITY_NAME becomes a single exact-name rule.
+HOLDSPORT_RULES = os.getenv("HOLDSPORT_RULES")
+RULES_FILE = os.getenv("RULES_FILE")
+
+WEEKDAYS = {
+    "man": 0, "tir": 1, "ons": 2, "tor": 3, "fre": 4, "lør": 5, "søn": 6,
+    "mon": 0, "tue": 1, "wed": 2, "thu": 3, "fri": 4, "sat": 5, "sun": 6,
+}
+
+# Distinct activity names seen before the name memo is reset
+NAME_MEMO_LIMIT = 1024
+
+
+def _parse_weekday(value):
+    if isinstance(value, int) and 0 <= value <= 6:
+        return value
+    day = WEEKDAYS.get(str(value).strip().lower()[:3])
+    if day is None:
+        raise ValueError(f"Ukendt ugedag i regel: {value!r}")
+    return day
+
+
+def _parse_clock(value):
+    if value is None:
+        return None
+    hours, minutes = str(value).split(":")
+    return dtime(int(hours), int(minutes))
+
+
+def _as_list(value):
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+class Rule:
+    """Én tilmeldingsregel: navn eller mønster plus valgfrie filtre"""
+
+    __slots__ = ("label", "name", "pattern", "teams", "weekdays", "time_from", "time_to")
+
+    def __init__(self, name=None, pattern=None, team=None, weekdays=None,
+                 time_from=None, time_to=None, label=None):
+        if not name and not pattern:
+            raise ValueError("En regel skal have 'name' eller 'pattern'")
+        self.name = name.strip().lower() if name else None
+        self.pattern = re.compile(pattern, re.IGNORECASE) if pattern else None
+        self.teams = frozenset(str(t).strip().lower() for t in _as_list(team))
+        self.weekdays = frozenset(_parse_weekday(d) for d in _as_list(weekdays))
+        self.time_from = _parse_clock(time_from)
+        self.time_to = _parse_clock(time_to)
+        self.label = label or name or pattern
+
+    @classmethod
+    def from_dict(cls, raw):
+        unknown = set(raw) - {"name", "pattern", "team", "weekdays", "time_from", "time_to", "label"}
+        if unknown:
+            raise ValueError(f"Ukendte felter i regel: {', '.join(sorted(unknown))}")
+        return cls(**raw)
+
+    @property
+    def needs_starttime(self):
+        return bool(self.weekdays) or self.time_from is not None or self.time_to is not None
+
+    def matches_filters(self, keys, starttime):
+        if self.teams and not self.teams & keys:
+            return False
+        if not self.needs_starttime:
+            return True
+        if starttime is None:
+            return False
+        if self.weekdays and starttime.weekday() not in self.weekdays:
+            return False
+        clock = starttime.time()
+        if self.time_from is not None and clock < self.time_from:
+            return False
+        if self.time_to is not None and clock > self.time_to:
+            return False
+        return True
+
+
+class RuleSet:
+    """Regler kompileret til et opslag på aktivitetsnavn.
+
+    Navne gentager sig fra uge til uge, så hvert distinkt rå navn normaliseres
+    og matches mod reglerne én gang og huskes derefter.
+    """
+
+    def __init__(self, rules):
+        if not rules:
+            raise ValueError("Der skal være mindst én regel")
+        self.rules = tuple(rules)
+        self.exact = {}
+        self.patterns = []
+        for rule in self.rules:
+            if rule.name is not None:
+                self.exact.setdefault(rule.name, []).append(rule)
+            if rule.pattern is not None:
+                self.patterns.append(rule)
+        self._by_name = {}
+
+    def candidates(self, raw_name):
+        rules = self._by_name.get(raw_name)
+        if rules is None:
+            normalized = raw_name.strip().lower()
+            hits = set(self.exact.get(normalized, ()))
+            hits.update(rule for rule in self.patterns if rule.pattern.search(normalized))
+            rules = tuple(rule for rule in self.rules if rule in hits)
+            if len(self._by_name) >= NAME_MEMO_LIMIT:
+                self._by_name.clear()
+            self._by_name[raw_name] = rules
+        return rules
+
+    def match(self, activity, keys):
+        """Returnér den første regel der matcher aktiviteten, ellers None"""
+        rules = self.candidates(activity.get("name", ""))
+        if not rules:
+            return None
+        starttime = parse_time(activity.get("starttime")) if any(r.needs_starttime for r in rules) else None
+        for rule in rules:
+            if rule.matches_filters(keys, starttime):
+                return rule
+        return None
+
+    def signature(self):
+        """Stabil beskrivelse af reglerne, så gemte match-resultater kan ugyldiggøres"""
+        return json.dumps([
+            [rule.name, rule.pattern.pattern if rule.pattern else None, sorted(rule.teams),
+             sorted(rule.weekdays), str(rule.time_from), str(rule.time_to)]
+            for rule in self.rules
+        ], ensure_ascii=False)
+
+    @classmethod
+    def from_config(cls, raw):
+        return cls([Rule.from_dict(entry) for entry in raw])
+
+    def describe(self):
+        return ", ".join(str(rule.label) for rule in self.rules)
+
+
+def team_keys(team):
+    """Nøgler en regels 'team'-filter kan ramme: id og navn"""
+    return frozenset((str(team.get("id", "")).lower(), str(team.get("name", "")).strip().lower()))
+
+
+def load_rules(activity_name, rules_file=RULES_FILE, rules_json=HOLDSPORT_RULES):
+    if rules_file:
+        with open(rules_file, encoding="utf-8") as f:
+            raw = json.load(f)
+    elif rules_json:
+        raw = json.loads(rules_json)
+    else:
+        raw = [{"name": activity_name}]
+    return RuleSet.from_config(raw)
@@ -0,0 +1,96 @@
+import os
+import random
+from datetime import datetime, timedelta
+
+from .resilience import ERROR_BACKOFF_BASE, ERROR_BACKOFF_MAX, backoff_delay
+
+# Adaptive polling settings
+ADAPTIVE_POLLING = os.getenv("ADAPTIVE_POLLING", "true").strip().lower() in ("1", "true", "yes")
+POLL_IDLE_INTERVAL = float(os.getenv("POLL_IDLE_INTERVAL", "900"))  # nothing close on the calendar
+POLL_FAST_INTERVAL = float(os.getenv("POLL_FAST_INTERVAL", "2"))  # around a registration opening
+POLL_FAST_WINDOW = float(os.getenv("POLL_FAST_WINDOW", "60"))  # seconds before/after opening
+POLL_NEAR_WINDOW = float(os.getenv("POLL_NEAR_WINDOW", "86400"))  # start within this -> normal interval
+POLL_JITTER = float(os.getenv("POLL_JITTER", "0.1"))  # fraction of the delay
+# Hours before start that registration opens, when the payload has no hint
+REGISTRATION_OPENS_BEFORE = os.getenv("REGISTRATION_OPENS_BEFORE")
+
+# Payload fields that may carry the registration-open time
+REGISTRATION_HINT_FIELDS = ("registration_start", "signup_start", "registration_opens_at", "open_at")
+
+
+def parse_time(value):
+    """Parse et Holdsport-tidsstempel til en tidszone-bevidst datetime"""
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        try:
+            parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    # Naive tider tolkes som lokal tid
+    return parsed if parsed.tzinfo else parsed.astimezone()
+
+
+def registration_opens_at(activity):
+    """Find tidspunktet hvor tilmeldingen åbner, hvis det kan udledes"""
+    for field in REGISTRATION_HINT_FIELDS:
+        opens_at = parse_time(activity.get(field))
+        if opens_at:
+            return opens_at
+    if REGISTRATION_OPENS_BEFORE:
+        starttime = parse_time(activity.get("starttime"))
+        if starttime:
+            return starttime - timedelta(hours=float(REGISTRATION_OPENS_BEFORE))
+    return None
+
+
+def _jitter(delay, early_only=False):
+    spread = delay * POLL_JITTER
+    return delay + random.uniform(-spread, 0 if early_only else spread)
+
+
+def next_poll_delay(activities, base_interval, now=None, failures=0):
+    """Beregn sekunder til næste tjek ud fra de matchende aktiviteter.
+
+    Returnerer (delay, reason). Aktiviteter man allerede er tilmeldt ignoreres.
+    Efter `failures` fejlede scanninger i træk prøves der igen med
+    eksponentiel backoff, hvis det kommer før det planlagte tjek.
+    """
+    delay, reason = _planned_delay(activities, base_interval, now)
+    if failures:
+        retry = backoff_delay(failures, ERROR_BACKOFF_BASE, ERROR_BACKOFF_MAX)
+        if retry < delay:
+            return retry, f"{failures} fejlede scanning(er) i træk"
+    return delay, reason
+
+
+def _planned_delay(activities, base_interval, now):
+    if not ADAPTIVE_POLLING:
+        return base_interval, "fast interval"
+
+    now = now or datetime.now().astimezone()
+    delay, reason = POLL_IDLE_INTERVAL, "intet tæt på"
+    early_only = False
+
+    for activity in activities:
+        if str(activity.get("status", "")).lower() == "tilmeldt":
+            continue
+
+        opens_at = registration_opens_at(activity)
+        if opens_at:
+            until_open = (opens_at - now).total_seconds()
+            if abs(until_open) <= POLL_FAST_WINDOW:
+                return POLL_FAST_INTERVAL + random.uniform(0, POLL_FAST_INTERVAL * POLL_JITTER), "tilmelding åbner nu"
+            if until_open > 0 and until_open - POLL_FAST_WINDOW < delay:
+                delay, reason = until_open - POLL_FAST_WINDOW, "venter på at tilmelding åbner"
+                early_only = True
+                continue
+
+        starttime = parse_time(activity.get("starttime"))
+        if starttime and 0 <= (starttime - now).total_seconds() <= POLL_NEAR_WINDOW and base_interval < delay:
+            delay, reason = base_interval, "aktivitet tæt på"
+            early_only = False
+
+    return max(POLL_FAST_INTERVAL, _jitter(delay, early_only)), reason
@@ -0,0 +1,94 @@
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime
+
+from .holdsport_client import REQUEST_ERRORS, activity_key
+
+# Pre-armed signup settings
+SNIPER_ENABLED = os.getenv("SNIPER_ENABLED", "true").strip().lower() in ("1", "true", "yes")
+SNIPER_LEAD = float(os.getenv("SNIPER_LEAD", "5"))  # seconds before opening to warm the connection
+SNIPER_BURST = int(os.getenv("SNIPER_BURST", "3"))  # attempts spread over the burst window
+SNIPER_BURST_WINDOW = float(os.getenv("SNIPER_BURST_WINDOW", "1"))  # seconds
+SNIPER_HORIZON = float(os.getenv("SNIPER_HORIZON", "21600"))  # only arm openings this close
+SNIPER_SPIN = 0.005  # final stretch is spent yielding instead of sleeping
+
+logger = logging.getLogger(__name__)
+
+
+async def sleep_until(target):
+    """Vent til et time.monotonic()-tidspunkt med millisekund-præcision"""
+    remaining = target - time.monotonic()
+    if remaining > SNIPER_SPIN:
+        await asyncio.sleep(remaining - SNIPER_SPIN)
+    while time.monotonic() < target:
+        await asyncio.sleep(0)
+
+
+class Sniper:
+    """Affyrer en forberedt tilmelding præcis når tilmeldingen åbner.
+
+    `on_result(activity, status_code)` kaldes med det endelige svar, så
+    notifikationer og tællere håndteres samme sted som ved en normal tilmelding.
+    `guard()` kaldes før hvert forsøg; returnerer den False, opgives tilmeldingen.
+    """
+
+    def __init__(self, client, on_result, guard=None):
+        self.client = client
+        self.on_result = on_result
+        self.guard = guard
+        self.armed = {}
+
+    def is_armed(self, activity):
+        return activity_key(activity) in self.armed
+
+    def arm(self, activity, opens_at):
+        key = activity_key(activity)
+        if not SNIPER_ENABLED or key is None or key in self.armed or not activity.get("action_path"):
+            return False
+        delay = (opens_at - datetime.now().astimezone()).total_seconds()
+        if delay <= 0 or delay > SNIPER_HORIZON:
+            return False
+
+        prepared = self.client.prepare_signup(activity)
+        target = time.monotonic() + delay
+        task = asyncio.create_task(self._fire(activity, prepared, target))
+        self.armed[key] = task
+        task.add_done_callback(lambda _: self.armed.pop(key, None))
+        logger.info(f"🎯 Tilmelding til {activity.get('name')} klargjort til {opens_at:%Y-%m-%d %H:%M:%S}")
+        return True
+
+    def cancel_all(self):
+        for task in list(self.armed.values()):
+            task.cancel()
+
+    async def _fire(self, activity, prepared, target):
+        await sleep_until(target - SNIPER_LEAD)
+        try:
+            await self.client.warm_up()
+        except REQUEST_ERRORS as e:
+            logger.warning(f"⚠️ Kunne ikke varme forbindelsen op: {e}")
+
+        status_code = None
+        attempts = max(1, SNIPER_BURST)
+        for attempt in range(attempts):
+            await sleep_until(target + attempt * SNIPER_BURST_WINDOW / attempts)
+            if self.guard is not None and not self.guard():
+                logger.warning("🎯 Tilmelding til %s opgivet – instansen er ikke længere leder", activity.get("name"))
+                break
+            sent = time.monotonic()
+            try:
+                status_code = await self.client.send_prepared(prepared)
+            except REQUEST_ERRORS as e:
+                logger.warning("🎯 Forsøg %d: sendt %.1f ms efter åbning, fejl: %s", attempt + 1, (sent - target) * 1000, e)
+                continue
+            logger.info(
+                "🎯 Forsøg %d: sendt %.1f ms efter åbning, svar %s efter %.1f ms",
+                attempt + 1, (sent - target) * 1000, status_code, (time.monotonic() - sent) * 1000
+            )
+            if status_code in (200, 201):
+                break
+
+        if status_code is not None:
+            await self.on_result(activity, status_code)
@@ -0,0 +1,190 @@
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+# State store settings
+STATE_DB = os.getenv("STATE_DB", "holdsport.db")  # empty = keep state in memory only
+STATE_BATCH_SIZE = int(os.getenv("STATE_BATCH_SIZE", "100"))
+STATE_FLUSH_INTERVAL = float(os.getenv("STATE_FLUSH_INTERVAL", "1"))  # seconds
+STATE_RETENTION_DAYS = int(os.getenv("STATE_RETENTION_DAYS", "60"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS activities (
+    account TEXT NOT NULL,
+    activity_key TEXT NOT NULL,
+    name TEXT,
+    starttime TEXT,
+    status TEXT,
+    fingerprint TEXT,
+    matched INTEGER NOT NULL DEFAULT 0,
+    handled INTEGER NOT NULL DEFAULT 0,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    PRIMARY KEY (account, activity_key)
+);
+CREATE TABLE IF NOT EXISTS signups (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    account TEXT NOT NULL,
+    activity_key TEXT NOT NULL,
+    status_code INTEGER,
+    error TEXT,
+    attempted_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS rule_signatures (
+    account TEXT PRIMARY KEY,
+    signature TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS activities_handled ON activities (account) WHERE handled = 1;
+"""
+
+logger = logging.getLogger(__name__)
+
+
+def fingerprint(activity):
+    """Det der skal ændre sig før en aktivitet undersøges igen"""
+    return json.dumps([activity.get("name"), activity.get("starttime"), activity.get("status")], ensure_ascii=False)
+
+
+def _connect(path):
+    conn = sqlite3.connect(path, timeout=10)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class StateStore:
+    """SQLite (WAL) med aktiviteter, tilmeldingsforsøg og livstidstællere.
+
+    Læsning sker ved opstart; alle skrivninger lægges i en kø, som en
+    baggrundstråd skriver i batches, så event loopet aldrig venter på disken.
+    """
+
+    def __init__(self, path=STATE_DB):
+        self.path = path
+        conn = _connect(path)
+        with conn:
+            conn.executescript(SCHEMA)
+            conn.execute(
+                "DELETE FROM activities WHERE last_seen < ?",
+                (time.time() - STATE_RETENTION_DAYS * 86400,)
+            )
+        conn.close()
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="state-writer", daemon=True)
+        self._writer.start()
+
+    # --- Læsning (kun ved opstart) ---
+
+    def load_activities(self, account, rules_signature):
+        """Returnér ({key: (fingerprint, matched)}, {handlede keys}) for en konto.
+
+        Er reglerne ændret siden sidst, er de gemte match-resultater ugyldige,
+        og kun de håndterede aktiviteter genbruges.
+        """
+        conn = _connect(self.path)
+        try:
+            rows = conn.execute(
+                "SELECT activity_key, fingerprint, matched, handled FROM activities WHERE account = ?",
+                (account,)
+            ).fetchall()
+            stored = conn.execute(
+                "SELECT signature FROM rule_signatures WHERE account = ?", (account,)
+            ).fetchone()
+        finally:
+            conn.close()
+        handled = {key for key, _, _, is_handled in rows if is_handled}
+        if stored is None or stored[0] != rules_signature:
+            self.save_rules_signature(account, rules_signature)
+            return {}, handled
+        seen = {key: (fp, bool(matched)) for key, fp, matched, _ in rows if fp is not None}
+        return seen, handled
+
+    def load_counters(self):
+        conn = _connect(self.path)
+        try:
+            return dict(conn.execute("SELECT name, value FROM counters").fetchall())
+        finally:
+            conn.close()
+
+    # --- Skrivning (via baggrundstråden) ---
+
+    def save_rules_signature(self, account, rules_signature):
+        self._queue.put((
+            "INSERT INTO rule_signatures (account, signature) VALUES (?, ?) "
+            "ON CONFLICT (account) DO UPDATE SET signature = excluded.signature",
+            (account, rules_signature)
+        ))
+
+    def record_activity(self, account, key, activity, fp, matched):
+        now = time.time()
+        self._queue.put((
+            "INSERT INTO activities (account, activity_key, name, starttime, status, fingerprint, matched, first_seen, last_seen) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (account, activity_key) DO UPDATE SET name = excluded.name, starttime = excluded.starttime, "
+            "status = excluded.status, fingerprint = excluded.fingerprint, matched = excluded.matched, last_seen = excluded.last_seen",
+            (account, str(key), activity.get("name"), activity.get("starttime"), str(activity.get("status", "")),
+             fp, int(matched), now, now)
+        ))
+
+    def mark_handled(self, account, key):
+        now = time.time()
+        self._queue.put((
+            "INSERT INTO activities (account, activity_key, handled, first_seen, last_seen) VALUES (?, ?, 1, ?, ?) "
+            "ON CONFLICT (account, activity_key) DO UPDATE SET handled = 1, last_seen = excluded.last_seen",
+            (account, str(key), now, now)
+        ))
+
+    def record_signup(self, account, key, status_code=None, error=None):
+        self._queue.put((
+            "INSERT INTO signups (account, activity_key, status_code, error, attempted_at) VALUES (?, ?, ?, ?, ?)",
+            (account, str(key), status_code, error, time.time())
+        ))
+
+    def save_counters(self, counters):
+        for name, value in counters.items():
+            self._queue.put((
+                "INSERT INTO counters (name, value) VALUES (?, ?) "
+                "ON CONFLICT (name) DO UPDATE SET value = excluded.value",
+                (name, int(value))
+            ))
+
+    def close(self):
+        """Skriv resten af køen og stop baggrundstråden"""
+        self._queue.put(None)
+        self._writer.join(timeout=10)
+
+    def _write_loop(self):
+        conn = _connect(self.path)
+        stopping = False
+        while not stopping:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + STATE_FLUSH_INTERVAL
+            while len(batch) < STATE_BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(item)
+                if item is None:
+                    break
+            if None in batch:
+                stopping = True
+                batch = [item for item in batch if item is not None]
+            try:
+                with conn:
+                    for sql, params in batch:
+                        conn.execute(sql, params)
+            except sqlite3.Error as e:
+                logger.error(f"❌ Kunne ikke gemme state: {e}")
+        conn.close()
@@ -0,0 +1,119 @@
+import os
+from datetime import timedelta
+
+from .holdsport_client import activity_key
+from .scheduler import parse_time, registration_opens_at
+
+# Incremental sync settings
+SYNC_FULL_INTERVAL = float(os.getenv("SYNC_FULL_INTERVAL", "3600"))  # seconds between full reconciles (0 = always full)
+SYNC_HOT_WINDOW = float(os.getenv("SYNC_HOT_WINDOW", "86400"))  # refresh days with a start or opening this close
+
+
+def merge_days(days):
+    """Sortér datoer og slå sammenhængende dage sammen til (fra, til)-intervaller"""
+    ranges = []
+    for day in sorted(days):
+        if ranges and day - ranges[-1][1] <= timedelta(days=1):
+            ranges[-1] = (ranges[-1][0], day)
+        else:
+            ranges.append((day, day))
+    return ranges
+
+
+class Diff:
+    """Ændringer i et holds vindue siden sidste synkronisering"""
+
+    __slots__ = ("new", "changed", "removed")
+
+    def __init__(self):
+        self.new = []
+        self.changed = []
+        self.removed = []
+
+    def __bool__(self):
+        return bool(self.new or self.changed or self.removed)
+
+    def __repr__(self):
+        return f"Diff(new={len(self.new)}, changed={len(self.changed)}, removed={len(self.removed)})"
+
+
+class TeamWindow:
+    """Lokal kopi af et holds aktiviteter i dato-vinduet.
+
+    Hver runde hentes kun de dage der er kommet til i enden af vinduet og
+    de "varme" dage – i dag og dage med en aktivitet der starter eller
+    åbner for tilmelding inden for SYNC_HOT_WINDOW. Hele vinduet hentes
+    ved første synkronisering og derefter hvert SYNC_FULL_INTERVAL sekund.
+    """
+
+    __slots__ = ("activities", "times", "end", "synced_at")
+
+    def __init__(self):
+        self.activities = {}  # key -> activity
+        self.times = {}  # key -> (dato, starttid, åbningstid), parset én gang pr. ændring
+        self.end = None
+        self.synced_at = None
+
+    def _store(self, key, activity):
+        starttime = parse_time(activity.get("starttime"))
+        self.activities[key] = activity
+        self.times[key] = (starttime.date() if starttime else None, starttime, registration_opens_at(activity))
+
+    def _remove(self, key, diff):
+        diff.removed.append(self.activities.pop(key))
+        del self.times[key]
+
+    def plan(self, start, end, now, moment, watched=()):
+        """Returnér ([(fra, til), ...], full) for næste synkronisering.
+
+        `start`/`end` er vinduets datoer, `now` et monotonic-tidspunkt og
+        `moment` det aktuelle (aware) tidspunkt til at finde varme dage.
+        `watched` er nøgler på matchede aktiviteter, hvis dage altid hentes –
+        så en tilmelding uden åbningstidspunkt ikke venter på næste fulde runde.
+        """
+        if self.end is None or SYNC_FULL_INTERVAL <= 0 or now - self.synced_at >= SYNC_FULL_INTERVAL:
+            return [(start, end)], True
+
+        days = {start}
+        days.update(self.times[key][0] for key in watched if key in self.times)
+        hot = timedelta(seconds=SYNC_HOT_WINDOW)
+        for day, starttime, opens_at in self.times.values():
+            if day is None:
+                continue
+            if (starttime and starttime <= moment + hot) or (opens_at and abs(opens_at - moment) <= hot):
+                days.add(day)
+        ranges = merge_days(day for day in days if day is not None and start <= day <= min(end, self.end))
+        if end > self.end:
+            ranges.append((self.end + timedelta(days=1), end))
+        return ranges, False
+
+    def apply(self, fetched, start, end, now, full):
+        """Indarbejd hentede intervaller [((fra, til), activities), ...] og returnér en Diff"""
+        diff = Diff()
+        for key, (day, _, _) in list(self.times.items()):
+            if day is not None and day < start:
+                self._remove(key, diff)
+
+        for (first, last), activities in fetched:
+            incoming = {}
+            for activity in activities:
+                key = activity_key(activity)
+                if key is not None:
+                    incoming[key] = activity
+            for key, (day, _, _) in list(self.times.items()):
+                if key not in incoming and (full or (day is not None and first <= day <= last)):
+                    self._remove(key, diff)
+            for key, activity in incoming.items():
+                known = self.activities.get(key)
+                if known is None:
+                    diff.new.append(activity)
+                elif known != activity:
+                    diff.changed.append(activity)
+                else:
+                    continue
+                self._store(key, activity)
+
+        self.end = end if self.end is None else max(self.end, end)
+        if full:
+            self.synced_at = now
+        return diff
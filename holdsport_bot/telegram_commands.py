@@ -0,0 +1,156 @@
+import asyncio
+import functools
+import hashlib
+import hmac
+import logging
+
+from telegram import Update
+from telegram.ext import Application, CommandHandler, ContextTypes
+
+logger = logging.getLogger(__name__)
+
+
+def build_application(token, admin_id, stop, report, allow_restart=False, polling=True, profiler=None,
+                      reload=None):
+    """Telegram-kommandoer til administratoren: /status, /stop, /start og evt. /restart.
+
+    `stop(restart=False)` stopper botten med det samme, også midt i en
+    ventetid. `report` skal være billig – den kaldes for hver /status. Med en
+    `profiler` kommer /profile, /memory og /slow til, og med `reload`
+    (kaldes med kilden og returnerer svaret) /reload.
+    """
+
+    def admin_only(handler):
+        @functools.wraps(handler)
+        async def wrapper(update: Update, context: ContextTypes.DEFAULT_TYPE):
+            if update.effective_user.id != admin_id:
+                await update.message.reply_text("⛔️ You are not authorized to use this command.")
+                return
+            await handler(update, context)
+        return wrapper
+
+    @admin_only
+    async def status_command(update, context):
+        await update.message.reply_text(report())
+
+    @admin_only
+    async def stop_command(update, context):
+        await update.message.reply_text("🛑 Stopping Holdsport Bot...")
+        stop()
+
+    @admin_only
+    async def start_command(update, context):
+        await update.message.reply_text("🤖 Holdsport Bot is already running!")
+
+    @admin_only
+    async def restart_command(update, context):
+        await update.message.reply_text("🔄 Restarting Holdsport Bot...")
+        stop(restart=True)
+
+    @admin_only
+    async def reload_command(update, context):
+        await update.message.reply_text(reload("/reload"))
+
+    async def reply_measurement(update, measure):
+        from .profiling import Busy
+        try:
+            summary, name = await measure
+        except Busy as e:
+            await update.message.reply_text(f"⏳ {e}")
+            return
+        await update.message.reply_text(summary[:4000])
+        if name:
+            with open(profiler.path(name), "rb") as f:
+                await update.message.reply_document(f, filename=name)
+
+    def seconds_arg(context, default=10):
+        try:
+            return float(context.args[0]) if context.args else default
+        except ValueError:
+            return default
+
+    @admin_only
+    async def profile_command(update, context):
+        seconds = seconds_arg(context)
+        await update.message.reply_text(f"🔥 Profilerer CPU i {seconds:.0f}s...")
+        await reply_measurement(update, profiler.cpu(seconds))
+
+    @admin_only
+    async def memory_command(update, context):
+        await reply_measurement(update, profiler.memory(stop=context.args[:1] == ["stop"]))
+
+    @admin_only
+    async def slow_command(update, context):
+        seconds = seconds_arg(context)
+        await update.message.reply_text(f"🐢 Måler event loop-callbacks i {seconds:.0f}s...")
+        await reply_measurement(update, profiler.slow_callbacks(seconds))
+
+    builder = Application.builder().token(token)
+    if not polling:
+        builder = builder.updater(None)
+    application = builder.build()
+    application.add_handler(CommandHandler("status", status_command))
+    application.add_handler(CommandHandler("stop", stop_command))
+    application.add_handler(CommandHandler("start", start_command))
+    if allow_restart:
+        application.add_handler(CommandHandler("restart", restart_command))
+    if reload is not None:
+        application.add_handler(CommandHandler("reload", reload_command))
+    if profiler is not None:
+        # block=False: en måling tager sekunder, og /status skal stadig svare imens
+        application.add_handler(CommandHandler("profile", profile_command, block=False))
+        application.add_handler(CommandHandler("memory", memory_command, block=False))
+        application.add_handler(CommandHandler("slow", slow_command, block=False))
+    return application
+
+
+async def listen(token, admin_id, stop, report, allow_restart=False, profiler=None, reload=None):
+    """Poll efter kommandoer i det kørende event loop, indtil tasken annulleres"""
+    application = build_application(token, admin_id, stop, report, allow_restart, profiler=profiler, reload=reload)
+    async with application:
+        await application.start()
+        await application.updater.start_polling()
+        logger.info("🎧 Starter Telegram command listener")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await application.updater.stop()
+            await application.stop()
+
+
+def webhook_secret(token):
+    """Standard-secret afledt af bot-tokenet, så webhooken aldrig står åben"""
+    return hashlib.sha256(token.encode()).hexdigest()[:32]
+
+
+def mount_webhook(web_app, application, path, secret):
+    """Modtag opdateringer på `path` i bottens egen aiohttp-app.
+
+    Skal kaldes før HTTP-serveren startes. Svaret sendes med det samme;
+    opdateringen behandles af Application i baggrunden.
+    """
+    from aiohttp import web
+
+    async def handle_update(request):
+        if not hmac.compare_digest(request.headers.get("X-Telegram-Bot-Api-Secret-Token", ""), secret):
+            return web.Response(status=403)
+        try:
+            data = await request.json()
+        except ValueError:
+            return web.Response(status=400)
+        await application.update_queue.put(Update.de_json(data, application.bot))
+        return web.Response()
+
+    web_app.router.add_post(path, handle_update)
+
+
+async def serve_webhook(application, url, secret):
+    """Registrér webhooken hos Telegram og behandl opdateringer, indtil tasken annulleres"""
+    async with application:
+        await application.start()
+        await application.bot.set_webhook(url, secret_token=secret, allowed_updates=[Update.MESSAGE])
+        logger.info(f"🎧 Telegram webhook aktiv på {url}")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await application.stop()
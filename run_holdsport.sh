@@ -1,4 +1,4 @@
 #!/bin/bash
 cd "$(dirname "$0")"
 source venv/bin/activate
-python main.py 
\ No newline at end of file
+python -m holdsport_bot 
\ No newline at end of file
@@ -32,6 +32,7 @@ source venv/bin/activate
 # Install requirements
 echo "📦 Installing Python packages..."
 pip install -r requirements.txt
+pip install -e .
 
 # Create .env file
 echo "🔐 Creating .env file..."
@@ -46,10 +47,13 @@ TELEGRAM_CHAT_ID=6052252183
 
 # Activity settings
 HOLDSPORT_ACTIVITY_NAME=Herre 4 træning
+
+# Raspberry Pi profile: Telegram commands and /restart, no HTTP server
+BOT_PROFILE=pi
 EOF
 
 echo "✅ Setup complete!"
 echo "🚀 To start the bot, run:"
 echo "   cd ~/holdsport-bot"
 echo "   source venv/bin/activate"
-echo "   python main.py" 
\ No newline at end of file
+echo "   holdsport-bot" 
\ No newline at end of file
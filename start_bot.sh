@@ -3,4 +3,4 @@
 # Start Holdsport Bot
 cd ~/holdsport-bot
 source venv/bin/activate
-python main_pi.py 
\ No newline at end of file
+BOT_PROFILE=pi python -m holdsport_bot 
\ No newline at end of file
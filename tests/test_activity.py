@@ -0,0 +1,98 @@
+import json
+import random
+
+import pytest
+
+from holdsport_bot.activity import Activity, ActivityParser, parse_activities
+
+
+def activity(n, **extra):
+    data = {
+        "id": n,
+        "name": f"Herre {n % 4} træning – \"åben\" }},{{",
+        "starttime": f"2026-10-{n % 28 + 1:02d}T19:00:00+02:00",
+        "place": "Hal ø",
+        "status": "" if n % 3 else "tilmeldt",
+        "action_path": f"/v1/activities/{n}/activities_users",
+        "action_method": "POST",
+        "actions": [{"activities_user": {"name": "Tilmeld", "joined_status": 1}}] if n % 2 else [],
+        "comments": [{"text": "😀 " * n}],
+        "club": {"name": "Klub", "nested": [1, 2.5, -3e2, None, True]},
+    }
+    data.update(extra)
+    return data
+
+
+def feed_in_chunks(body, rng):
+    parser = ActivityParser()
+    found = []
+    pos = 0
+    while pos < len(body):
+        size = rng.randint(1, 64)
+        found.extend(parser.feed(body[pos:pos + size]))
+        pos += size
+    return found + parser.close()
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_random_chunking_matches_json_loads(seed):
+    rng = random.Random(seed)
+    items = [activity(n, registration_start="2026-10-01T12:00:00+02:00") if n % 5 == 0 else activity(n)
+             for n in range(rng.randint(0, 12))]
+    body = json.dumps(items, ensure_ascii=rng.random() < 0.5, indent=rng.choice([None, 0, 2]),
+                      separators=rng.choice([None, (",", ":")])).encode()
+
+    expected = [Activity.from_dict(item) for item in json.loads(body)]
+    assert feed_in_chunks(body, rng) == expected
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_scalars_split_across_chunks(seed):
+    rng = random.Random(seed)
+    values = [3.5, 1e3, -2, 12345678901234567890, -0.25e-3, True, False, None, "x, ]", {"id": 7}, [1, [2]]]
+    rng.shuffle(values)
+    body = json.dumps(values).encode()
+    assert feed_in_chunks(body, rng) == [Activity.from_dict({"id": 7})]
+
+
+@pytest.mark.parametrize("parts", [
+    [b"[3.", b"5]"],
+    [b"[3", b".5]"],
+    [b"[1e", b"3, {\"id\": 1}]"],
+    [b"[-", b"1, {\"id\": 1}]"],
+])
+def test_number_split_at_any_point(parts):
+    parser = ActivityParser()
+    found = []
+    for part in parts:
+        found.extend(parser.feed(part))
+    found.extend(parser.close())
+    assert [a.id for a in found] == [1] * (b"id" in b"".join(parts))
+
+
+def test_multibyte_character_split_between_chunks():
+    body = json.dumps([{"id": 1, "name": "Æblegrød"}], ensure_ascii=False).encode()
+    split = body.index("Æ".encode()) + 1
+    parser = ActivityParser()
+    found = parser.feed(body[:split]) + parser.feed(body[split:]) + parser.close()
+    assert found[0].name == "Æblegrød"
+
+
+@pytest.mark.parametrize("body", [b"{}", b"[{\"id\": 1}", b"[{\"id\": 1}] []", b"[{\"id\": 1} {\"id\": 2}]", b"[1,,2]"])
+def test_invalid_input_raises_value_error(body):
+    with pytest.raises(ValueError):
+        parse_activities(body, chunk_size=3)
+
+
+def test_activity_behaves_like_the_raw_dict():
+    raw = activity(1, registration_start="2026-10-01T12:00:00+02:00")
+    record = Activity.from_dict(raw)
+    assert record.get("name") == raw["name"]
+    assert record["registration_start"] == raw["registration_start"]
+    assert record.get("comments") is None
+    assert record.get("missing", "standard") == "standard"
+    assert record.actions == ("tilmeld",)
+    with pytest.raises(KeyError):
+        record["missing"]
+    assert record.to_dict()["actions"] == ["tilmeld"]
+    assert record.to_dict()["registration_start"] == raw["registration_start"]
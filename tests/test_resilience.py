@@ -0,0 +1,114 @@
+import pytest
+
+from holdsport_bot import resilience
+from holdsport_bot.resilience import CircuitBreaker, CircuitOpenError, backoff_delay
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(resilience.time, "monotonic", clock)
+    return clock
+
+
+def breaker(**kwargs):
+    return CircuitBreaker("test", **{"threshold": 3, "cooldown": 10, "max_cooldown": 40, "spacing": 5, **kwargs})
+
+
+def fail(b, clock, times, step):
+    for _ in range(times):
+        b.failure()
+        clock.now += step
+
+
+def test_opens_after_threshold_failures_spread_over_time(clock):
+    b = breaker()
+    fail(b, clock, 2, 5)
+    b.check()
+    fail(b, clock, 1, 0)
+    assert b.is_open
+    with pytest.raises(CircuitOpenError):
+        b.check()
+
+
+def test_parallel_failures_count_once(clock):
+    b = breaker()
+    fail(b, clock, 20, 0.1)
+    assert not b.is_open
+    assert b.failures == 1
+
+
+def test_success_resets_the_count(clock):
+    b = breaker()
+    fail(b, clock, 2, 5)
+    b.success()
+    fail(b, clock, 2, 5)
+    assert not b.is_open
+
+
+def test_half_open_probe_closes_or_doubles_cooldown(clock):
+    b = breaker()
+    fail(b, clock, 3, 5)
+    clock.now += 10
+    b.check()  # prøvekaldet slipper igennem
+    with pytest.raises(CircuitOpenError):
+        b.check()  # men kun ét ad gangen
+    b.failure()
+    assert b.cooldown == 20
+    clock.now += 20
+    b.check()
+    b.failure()
+    clock.now += 40
+    b.check()
+    b.failure()
+    assert b.cooldown == 40  # max_cooldown
+    clock.now += 40
+    b.check()
+    b.success()
+    assert not b.is_open and b.cooldown == 10
+
+
+def test_abandoned_probe_lets_the_next_call_try(clock):
+    b = breaker()
+    fail(b, clock, 3, 5)
+    clock.now += 10
+    b.check()
+    b.abandon()
+    b.check()
+
+
+def test_known_opening_caps_the_pause(clock, monkeypatch):
+    monkeypatch.setattr(resilience, "BREAKER_OPENING_COOLDOWN", 2)
+    monkeypatch.setattr(resilience, "BREAKER_OPENING_WINDOW", 60)
+    b = breaker(cooldown=600, max_cooldown=600)
+    b.expect_opening(clock.now + 30)
+    fail(b, clock, 3, 5)
+    # åbnede ved +10 og står nu ved +15; hviler kun til åbningen ved +30
+    assert b.retry_in() == pytest.approx(15)
+    clock.now += 15
+    b.check()
+    b.failure()
+    # efter åbningen højst BREAKER_OPENING_COOLDOWN
+    assert b.retry_in() == pytest.approx(2)
+
+
+def test_stale_opening_is_ignored(clock, monkeypatch):
+    monkeypatch.setattr(resilience, "BREAKER_OPENING_WINDOW", 60)
+    b = breaker()
+    b.expect_opening(clock.now - 120)
+    fail(b, clock, 3, 5)
+    assert b.retry_in() == pytest.approx(5)  # almindelig cooldown fra +10
+
+
+@pytest.mark.parametrize("attempt", range(1, 12))
+def test_backoff_delay_is_bounded(attempt):
+    for _ in range(50):
+        assert 0 <= backoff_delay(attempt, 2, 300) <= min(300, 2 * 2 ** (attempt - 1))
@@ -0,0 +1,95 @@
+import pytest
+
+from holdsport_bot.activity import Activity
+from holdsport_bot.rules import Rule, RuleSet, team_keys
+
+TEAM = team_keys({"id": 7, "name": "Herrer 1"})
+OTHER = team_keys({"id": 8, "name": "Damer"})
+# Tirsdag 6. oktober 2026 kl. 19:30
+TUESDAY = "2026-10-06T19:30:00+02:00"
+
+
+def activity(name, starttime=TUESDAY):
+    return Activity.from_dict({"id": 1, "name": name, "starttime": starttime})
+
+
+def ruleset(*raw):
+    return RuleSet.from_config(list(raw))
+
+
+def test_exact_name_ignores_case_and_whitespace():
+    rules = ruleset({"name": "Træning"})
+    assert rules.match(activity("  TRÆNING "), TEAM) is rules.rules[0]
+    assert rules.match(activity("Træning ekstra"), TEAM) is None
+
+
+def test_pattern_searches_the_normalized_name():
+    rules = ruleset({"pattern": "^træning.*herrer"})
+    assert rules.match(activity("Træning – Herrer"), TEAM)
+    assert rules.match(activity("Kamp – Herrer"), TEAM) is None
+
+
+def test_first_matching_rule_in_config_order_wins():
+    rules = ruleset({"pattern": "træning", "team": "damer", "label": "damer"},
+                    {"name": "træning", "label": "alle"})
+    assert rules.match(activity("Træning"), OTHER).label == "damer"
+    assert rules.match(activity("Træning"), TEAM).label == "alle"
+
+
+@pytest.mark.parametrize("team, keys, matches", [
+    ("herrer 1", TEAM, True),
+    (7, TEAM, True),
+    (["damer", "7"], TEAM, True),
+    ("damer", TEAM, False),
+])
+def test_team_filter_matches_id_or_name(team, keys, matches):
+    rules = ruleset({"name": "Træning", "team": team})
+    assert bool(rules.match(activity("Træning"), keys)) is matches
+
+
+@pytest.mark.parametrize("filters, matches", [
+    ({"weekdays": ["tirsdag"]}, True),
+    ({"weekdays": ["tue", "thu"]}, True),
+    ({"weekdays": [3]}, False),
+    ({"time_from": "19:00", "time_to": "20:00"}, True),
+    ({"time_from": "19:45"}, False),
+    ({"time_to": "19:00"}, False),
+])
+def test_weekday_and_time_filters(filters, matches):
+    rules = ruleset({"name": "Træning", **filters})
+    assert bool(rules.match(activity("Træning"), TEAM)) is matches
+
+
+def test_time_filter_needs_a_starttime():
+    rules = ruleset({"name": "Træning", "weekdays": ["tir"]})
+    assert rules.match(activity("Træning", starttime=None), TEAM) is None
+
+
+def test_memo_is_reset_at_the_limit(monkeypatch):
+    from holdsport_bot import rules as module
+    monkeypatch.setattr(module, "NAME_MEMO_LIMIT", 2)
+    rules = ruleset({"name": "a"})
+    for name in ("a", "b", "c"):
+        rules.match(activity(name), TEAM)
+    assert list(rules._by_name) == ["c"]
+
+
+@pytest.mark.parametrize("raw, message", [
+    ({"name": "a", "hold": "x"}, "Ukendte felter"),
+    ({"team": "x"}, "'name' eller 'pattern'"),
+    ({"name": "a", "weekdays": ["funday"]}, "Ukendt ugedag"),
+])
+def test_invalid_rules_are_rejected(raw, message):
+    with pytest.raises(ValueError, match=message):
+        Rule.from_dict(raw)
+
+
+def test_empty_ruleset_is_rejected():
+    with pytest.raises(ValueError):
+        RuleSet([])
+
+
+def test_signature_changes_with_the_filters_only():
+    base = ruleset({"name": "Træning", "team": "7"})
+    assert base.signature() == ruleset({"name": "træning", "team": 7, "label": "andet"}).signature()
+    assert base.signature() != ruleset({"name": "Træning", "team": "8"}).signature()
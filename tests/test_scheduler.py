@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from holdsport_bot import scheduler
+from holdsport_bot.activity import Activity
+from holdsport_bot.scheduler import next_poll_delay, registration_opens_at
+
+NOW = datetime(2026, 10, 6, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture(autouse=True)
+def settings(monkeypatch):
+    for name, value in {"ADAPTIVE_POLLING": True, "POLL_IDLE_INTERVAL": 900, "POLL_FAST_INTERVAL": 2,
+                        "POLL_FAST_WINDOW": 60, "POLL_NEAR_WINDOW": 86400, "POLL_JITTER": 0,
+                        "REGISTRATION_OPENS_BEFORE": None}.items():
+        monkeypatch.setattr(scheduler, name, value)
+
+
+def activity(starts_in=None, opens_in=None, **extra):
+    raw = dict(extra, id=1, name="Træning")
+    if starts_in is not None:
+        raw["starttime"] = (NOW + timedelta(seconds=starts_in)).isoformat()
+    if opens_in is not None:
+        raw["registration_start"] = (NOW + timedelta(seconds=opens_in)).isoformat()
+    return Activity.from_dict(raw)
+
+
+def test_nothing_close_polls_at_the_idle_interval():
+    assert next_poll_delay([activity(starts_in=5 * 86400)], 60, NOW) == (900, "intet tæt på")
+
+
+def test_activity_within_near_window_uses_the_base_interval():
+    assert next_poll_delay([activity(starts_in=3600)], 60, NOW) == (60, "aktivitet tæt på")
+
+
+@pytest.mark.parametrize("opens_in", [-60, -10, 0, 30, 60])
+def test_fast_polling_around_the_opening(opens_in):
+    assert next_poll_delay([activity(starts_in=86400, opens_in=opens_in)], 60, NOW) == (2, "tilmelding åbner nu")
+
+
+def test_waits_until_just_before_the_opening():
+    delay, reason = next_poll_delay([activity(starts_in=86400, opens_in=600)], 60, NOW)
+    assert (delay, reason) == (540, "venter på at tilmelding åbner")
+
+
+def test_jitter_never_delays_past_the_opening(monkeypatch):
+    monkeypatch.setattr(scheduler, "POLL_JITTER", 0.5)
+    for _ in range(100):
+        delay, _ = next_poll_delay([activity(opens_in=600)], 60, NOW)
+        assert 270 <= delay <= 540
+
+
+def test_signed_up_activities_are_ignored():
+    activities = [activity(starts_in=3600, opens_in=10, status="Tilmeldt")]
+    assert next_poll_delay(activities, 60, NOW) == (900, "intet tæt på")
+
+
+def test_delay_is_never_below_the_fast_interval():
+    assert next_poll_delay([activity(opens_in=61)], 60, NOW)[0] == 2
+
+
+def test_fixed_interval_without_adaptive_polling(monkeypatch):
+    monkeypatch.setattr(scheduler, "ADAPTIVE_POLLING", False)
+    assert next_poll_delay([activity(opens_in=0)], 60, NOW) == (60, "fast interval")
+
+
+def test_failures_retry_sooner_with_backoff(monkeypatch):
+    monkeypatch.setattr(scheduler, "backoff_delay", lambda attempt, base, cap: 4 * attempt)
+    assert next_poll_delay([], 60, NOW, failures=3) == (12, "3 fejlede scanning(er) i træk")
+    # men aldrig senere end det planlagte tjek
+    assert next_poll_delay([activity(opens_in=0)], 60, NOW, failures=3) == (2, "tilmelding åbner nu")
+
+
+def test_opening_falls_back_to_hours_before_start(monkeypatch):
+    monkeypatch.setattr(scheduler, "REGISTRATION_OPENS_BEFORE", "48")
+    assert registration_opens_at(activity(starts_in=3 * 86400)) == NOW + timedelta(days=1)
+    assert registration_opens_at(activity()) is None
@@ -0,0 +1,94 @@
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from holdsport_bot import sync
+from holdsport_bot.activity import Activity
+from holdsport_bot.sync import TeamWindow, merge_days
+
+TZ = timezone(timedelta(hours=2))
+START = date(2026, 10, 1)
+END = date(2026, 10, 10)
+NOW = datetime(2026, 10, 1, 8, 0, tzinfo=TZ)
+
+
+def activity(n, day, **extra):
+    return Activity.from_dict({"id": n, "name": f"Træning {n}",
+                               "starttime": datetime.combine(day, datetime.min.time().replace(hour=19), TZ).isoformat(),
+                               **extra})
+
+
+def days(n):
+    return START + timedelta(days=n)
+
+
+@pytest.fixture(autouse=True)
+def settings(monkeypatch):
+    monkeypatch.setattr(sync, "SYNC_FULL_INTERVAL", 3600)
+    monkeypatch.setattr(sync, "SYNC_HOT_WINDOW", 86400)
+
+
+def synced_window(activities):
+    window = TeamWindow()
+    ranges, full = window.plan(START, END, 0, NOW)
+    assert (ranges, full) == ([(START, END)], True)
+    diff = window.apply([(ranges[0], activities)], START, END, 0, full)
+    assert len(diff.new) == len(activities)
+    return window
+
+
+def test_merge_days_joins_adjacent_dates():
+    assert merge_days([days(3), days(0), days(1), days(5)]) == [(days(0), days(1)), (days(3), days(3)), (days(5), days(5))]
+
+
+def test_incremental_plan_fetches_today_hot_watched_and_new_days():
+    window = synced_window([activity(1, days(0)), activity(2, days(1)), activity(3, days(4)), activity(4, days(8))])
+    ranges, full = window.plan(START, END + timedelta(days=2), 10, NOW, watched=["4"])
+    assert not full
+    # kun i dag er inden for det varme vindue (dag 1 kl. 19 er 35 timer væk),
+    # dag 8 er overvåget, og to nye dage er kommet til i enden
+    assert ranges == [(days(0), days(0)), (days(8), days(8)), (END + timedelta(days=1), END + timedelta(days=2))]
+
+
+def test_opening_within_hot_window_makes_the_day_hot():
+    opens = (NOW + timedelta(hours=3)).isoformat()
+    window = synced_window([activity(1, days(6), registration_start=opens)])
+    ranges, _ = window.plan(START, END, 10, NOW)
+    assert ranges == [(days(0), days(0)), (days(6), days(6))]
+
+
+def test_full_sync_after_interval_or_when_disabled(monkeypatch):
+    window = synced_window([activity(1, days(2))])
+    assert window.plan(START, END, 3600, NOW)[1] is True
+    monkeypatch.setattr(sync, "SYNC_FULL_INTERVAL", 0)
+    assert window.plan(START, END, 1, NOW)[1] is True
+
+
+def test_partial_apply_only_removes_missing_activities_inside_the_fetched_range():
+    window = synced_window([activity(1, days(0)), activity(2, days(0)), activity(3, days(5))])
+    changed = activity(1, days(0), status="tilmeldt")
+    diff = window.apply([((days(0), days(0)), [changed])], START, END, 10, False)
+    assert diff.changed == [changed]
+    assert [a.id for a in diff.removed] == [2]
+    assert set(window.activities) == {"1", "3"}
+
+
+def test_full_apply_removes_everything_missing():
+    window = synced_window([activity(1, days(0)), activity(3, days(5))])
+    diff = window.apply([((START, END), [activity(1, days(0))])], START, END, 4000, True)
+    assert not diff.new and not diff.changed
+    assert [a.id for a in diff.removed] == [3]
+    assert window.synced_at == 4000
+
+
+def test_days_before_the_window_are_pruned():
+    window = synced_window([activity(1, days(0)), activity(2, days(3))])
+    diff = window.apply([], days(1), END, 10, False)
+    assert [a.id for a in diff.removed] == [1]
+    assert set(window.activities) == {"2"}
+
+
+def test_unchanged_activity_gives_empty_diff():
+    window = synced_window([activity(1, days(0))])
+    diff = window.apply([((days(0), days(0)), [activity(1, days(0))])], START, END, 10, False)
+    assert not diff